@@ -0,0 +1,91 @@
+import frappe
+from frappe import _
+from frappe.model.db_query import DatabaseQuery
+from frappe.utils import cint, flt
+
+from cashiercounter.cashier.doctype.cashier_invoice_reservation.cashier_invoice_reservation import RESERVED_ROW_CONDITION
+
+MAX_PAGE_LENGTH = 500
+
+def check_invoice_permission(customer):
+    if not frappe.has_permission("Sales Invoice", "read"):
+        frappe.throw(_("Not permitted to read Sales Invoices"), frappe.PermissionError)
+    frappe.has_permission("Customer", "read", doc=customer, throw=True)
+
+def fetch_open_invoices(customer, after_due_date=None, after_name=None, page_length=50, collection=None):
+    conditions = ""
+    values = {"customer": customer, "page_length": page_length, "collection": collection or ""}
+    if after_due_date and after_name:
+        # Keyset on (due_date, name): resume strictly after the last row of the previous page
+        conditions = """AND (`tabSales Invoice`.due_date > %(after_due_date)s
+            OR (`tabSales Invoice`.due_date = %(after_due_date)s AND `tabSales Invoice`.name > %(after_name)s))"""
+        values.update({"after_due_date": after_due_date, "after_name": after_name})
+
+    # User Permissions and permission query conditions of Sales Invoice
+    match_conditions = DatabaseQuery("Sales Invoice").build_match_conditions()
+    if match_conditions:
+        conditions += f" AND {match_conditions}"
+
+    # Invoices held by another collection would be rejected by its duplicate guard on save
+    return frappe.db.sql(f"""
+        SELECT `tabSales Invoice`.name as invoice, `tabSales Invoice`.posting_date as invoice_date,
+            `tabSales Invoice`.outstanding_amount as outstanding, `tabSales Invoice`.due_date
+        FROM `tabSales Invoice`
+        WHERE `tabSales Invoice`.customer = %(customer)s
+        AND `tabSales Invoice`.docstatus = 1
+        AND `tabSales Invoice`.outstanding_amount > 0
+        AND NOT EXISTS (
+            SELECT 1 FROM `tabCashier Collection Invoice`
+            WHERE invoice = `tabSales Invoice`.name
+            AND parenttype = 'Cashier Collection'
+            AND parent != %(collection)s
+            AND {RESERVED_ROW_CONDITION}
+        )
+        {conditions}
+        ORDER BY `tabSales Invoice`.due_date, `tabSales Invoice`.name
+        LIMIT %(page_length)s
+    """, values, as_dict=True)
+
+@frappe.whitelist()
+def get_open_invoices(customer, after_due_date=None, after_name=None, page_length=50, collection=None):
+    check_invoice_permission(customer)
+    page_length = min(max(cint(page_length) or 50, 1), MAX_PAGE_LENGTH)
+    rows = fetch_open_invoices(customer, after_due_date, after_name, page_length, collection)
+
+    next_cursor = None
+    if len(rows) == page_length:
+        next_cursor = {"after_due_date": rows[-1].due_date, "after_name": rows[-1].invoice}
+
+    for row in rows:
+        del row["due_date"]
+
+    return {"invoices": rows, "next_cursor": next_cursor}
+
+@frappe.whitelist()
+def allocate_open_invoices(customer, amount, limit=None, collection=None):
+    """Fill the oldest open invoices, at most `limit` of them, until `amount` is allocated"""
+    check_invoice_permission(customer)
+    remaining = flt(amount)
+    limit = max(cint(limit), 0)
+    allocations = []
+    cursor = {}
+
+    while remaining > 0 and (not limit or len(allocations) < limit):
+        page_length = min(limit - len(allocations), MAX_PAGE_LENGTH) if limit else MAX_PAGE_LENGTH
+        rows = fetch_open_invoices(customer, page_length=page_length, collection=collection, **cursor)
+        for row in rows:
+            received = min(flt(row.outstanding), remaining)
+            allocations.append({
+                "invoice": row.invoice,
+                "invoice_date": row.invoice_date,
+                "outstanding": row.outstanding,
+                "received": received
+            })
+            remaining = flt(remaining - received, 6)
+            if remaining <= 0:
+                break
+        if len(rows) < page_length:
+            break
+        cursor = {"after_due_date": rows[-1].due_date, "after_name": rows[-1].invoice}
+
+    return {"invoices": allocations, "unallocated": max(remaining, 0)}
@@ -0,0 +1,10 @@
+"""
+Benchmarks for the purchase discount pipeline
+
+Run from the directory containing the app, without a bench:
+
+    python -m cashiercounter.benchmarks --rows 10,100,1000,10000
+
+frappe is replaced by an in-memory stand-in (see frappe_standin.py), so the
+reported database round trips are the queries the doc hooks would issue.
+"""
@@ -0,0 +1,8 @@
+from cashiercounter.benchmarks import frappe_standin
+
+# The stand-in must be registered before any app module imports frappe
+frappe_standin.install()
+
+from cashiercounter.benchmarks.pipeline import main  # noqa: E402
+
+main()
@@ -0,0 +1,111 @@
+"""
+Synthetic data for purchase pipeline benchmarks
+Generates suppliers, items, discount agreements, promotions, incentive
+schemes, turnover ledger rows and purchase documents in the stand-in database.
+"""
+
+import random
+
+from cashiercounter.benchmarks import frappe_standin
+from cashiercounter.benchmarks.frappe_standin import add_days, db, nowdate
+
+
+def load_fixtures(rows, suppliers=5, promotions=8, seed=42):
+    """Reset the stand-in database and fill it for documents of `rows` lines"""
+    rng = random.Random(seed)
+    db.tables.clear()
+    db.sql_handlers.clear()
+    frappe_standin.cache.clear()
+
+    item_codes = [f"ITEM-{index:05d}" for index in range(max(rows * 2, 500))]
+    supplier_names = [f"SUP-{index:04d}" for index in range(suppliers)]
+
+    for supplier in supplier_names:
+        db.insert("Supplier", {
+            "name": supplier,
+            "supplier_name": supplier,
+            "disabled": 0,
+            "default_invoice_discount": rng.choice([0, 2, 5])
+        })
+
+        for item_code in rng.sample(item_codes, len(item_codes) * 2 // 5):
+            db.insert("Purchase Discount Agreement", {
+                "name": f"PDA-{supplier}-{item_code}",
+                "supplier": supplier,
+                "item_code": item_code,
+                "discount_percentage": rng.choice([2.5, 5, 7.5, 10, 12.5]),
+                "is_active": 1
+            })
+
+        for days in range(366):
+            db.insert("Supplier Turnover Ledger", {
+                "name": f"{supplier}-{add_days(nowdate(), -days)}",
+                "supplier": supplier,
+                "posting_date": add_days(nowdate(), -days),
+                "turnover": rng.uniform(0, 20000),
+                "invoice_count": 1
+            })
+
+    for index in range(promotions):
+        name = f"PROMO-{index:02d}"
+        db.insert("Seasonal Promotion", {
+            "name": name,
+            "promotion_name": name,
+            "is_active": 1,
+            "start_date": add_days(nowdate(), -10),
+            "end_date": add_days(nowdate(), 10),
+            "discount_percentage": rng.choice([1, 2, 3, 5])
+        })
+
+        # Every other promotion is limited to a list of items
+        if index % 2:
+            for item_code in rng.sample(item_codes, 50):
+                db.insert("Seasonal Promotion Item", {
+                    "parent": name,
+                    "parenttype": "Seasonal Promotion",
+                    "item_code": item_code
+                })
+
+    for index, min_turnover in enumerate([100000, 500000, 1000000, 2500000, 5000000]):
+        db.insert("Turnover Incentive", {
+            "name": f"TIER-{index}",
+            "is_active": 1,
+            "min_turnover": min_turnover,
+            "incentive_percentage": 0.5 + index * 0.5,
+            "max_incentive_amount": 0
+        })
+
+    db.register_sql("Supplier Turnover Ledger", _turnover_ledger_sql)
+
+    return item_codes, supplier_names
+
+
+def _turnover_ledger_sql(query, values):
+    supplier, from_date, to_date = values
+    total = sum(
+        row.turnover for row in db.tables.get("Supplier Turnover Ledger", [])
+        if row.supplier == supplier and from_date <= row.posting_date <= to_date
+    )
+    return [frappe_standin._dict(total=total)]
+
+
+def make_document(doctype, rows, item_codes, supplier, seed=7):
+    """Build a purchase document with `rows` item lines"""
+    rng = random.Random(seed)
+    items = []
+    for item_code in rng.choices(item_codes, k=rows):
+        qty = rng.randint(1, 50)
+        rate = round(rng.uniform(5, 2500), 2)
+        items.append({"item_code": item_code, "qty": qty, "rate": rate, "amount": qty * rate})
+
+    doc = frappe_standin.new_doc(doctype)
+    doc.update({
+        "supplier": supplier,
+        "supplier_name": supplier,
+        "posting_date": nowdate(),
+        "apply_discount": 1,
+        "discount_type": "Item-wise",
+        "items": [frappe_standin.Document(dict(row, doctype=f"{doctype} Item")) for row in items],
+        "total": sum(row["amount"] for row in items)
+    })
+    return doc
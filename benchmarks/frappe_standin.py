@@ -0,0 +1,473 @@
+"""
+In-process frappe stand-in for benchmarks
+Provides just enough of frappe (db, get_all, get_doc, new_doc, cache, utils,
+Document) to run the purchase discount pipeline without a bench, while
+counting every database and cache round trip.
+"""
+
+import datetime
+import hashlib
+import json
+import random
+import sys
+import types
+from decimal import Decimal, ROUND_HALF_UP
+
+
+class _dict(dict):
+    """Attribute-access dict, as frappe._dict"""
+
+    def __getattr__(self, key):
+        return self.get(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def copy(self):
+        return _dict(dict(self))
+
+
+class Stats:
+    """Round-trip counters for one benchmark stage"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.db_calls = 0
+        self.cache_calls = 0
+
+
+stats = Stats()
+
+
+class InMemoryCache:
+    """Dict-backed replacement for frappe.cache()"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get_value(self, key, generator=None, **kwargs):
+        stats.cache_calls += 1
+        value = self.store.get(key)
+        if value is None and generator:
+            value = generator()
+            self.store[key] = value
+        return value
+
+    def set_value(self, key, value, expires_in_sec=None, **kwargs):
+        stats.cache_calls += 1
+        self.store[key] = value
+
+    def delete_value(self, keys, **kwargs):
+        stats.cache_calls += 1
+        for key in keys if isinstance(keys, (list, tuple)) else [keys]:
+            self.store.pop(key, None)
+
+    def lpush(self, key, value):
+        stats.cache_calls += 1
+        self.store.setdefault(key, []).insert(0, value)
+
+    def ltrim(self, key, start, stop):
+        stats.cache_calls += 1
+        self.store[key] = self.store.get(key, [])[start:stop + 1]
+
+    def lrange(self, key, start, stop):
+        stats.cache_calls += 1
+        return self.store.get(key, [])[start:stop + 1]
+
+    def clear(self):
+        self.store.clear()
+
+
+def _normalize_filters(filters):
+    normalized = []
+    for fieldname, condition in (filters or {}).items():
+        if isinstance(condition, (list, tuple)):
+            operator, operand = condition[0].lower(), condition[1]
+        else:
+            operator, operand = "=", condition
+
+        if operator in ("in", "not in"):
+            operand = set(operand)
+        normalized.append((fieldname, operator, operand))
+
+    return normalized
+
+
+def _matches(row, filters):
+    for fieldname, operator, operand in filters:
+        value = row.get(fieldname)
+
+        if operator == "=" and value != operand:
+            return False
+        if operator == "!=" and value == operand:
+            return False
+        if operator == "in" and value not in operand:
+            return False
+        if operator == "not in" and value in operand:
+            return False
+        if operator in ("<", "<=", ">", ">=") and (value is None or not _compare(value, operator, operand)):
+            return False
+        if operator == "between" and (value is None or not operand[0] <= value <= operand[1]):
+            return False
+
+    return True
+
+
+def _compare(value, operator, operand):
+    return {
+        "<": value < operand,
+        "<=": value <= operand,
+        ">": value > operand,
+        ">=": value >= operand
+    }[operator]
+
+
+class InMemoryDatabase:
+    """Table store behind frappe.db and frappe.get_all
+
+    Raw SQL is answered by handlers registered per table name, since the
+    stand-in does not parse SQL.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.sql_handlers = {}
+
+    def insert(self, doctype, row):
+        self.tables.setdefault(doctype, []).append(_dict(row))
+
+    def get_rows(self, doctype, filters=None):
+        filters = _normalize_filters(filters)
+        return [row for row in self.tables.get(doctype, []) if _matches(row, filters)]
+
+    def register_sql(self, table, handler):
+        self.sql_handlers[table] = handler
+
+    def sql(self, query, values=None, as_dict=False, **kwargs):
+        stats.db_calls += 1
+        for table, handler in self.sql_handlers.items():
+            if f"`tab{table}`" in query:
+                return handler(query, values)
+        return []
+
+    def get_value(self, doctype, filters, fieldname="name", as_dict=False, **kwargs):
+        stats.db_calls += 1
+        if isinstance(filters, str):
+            filters = {"name": filters}
+
+        rows = self.get_rows(doctype, filters)
+        if not rows:
+            return None
+
+        if isinstance(fieldname, (list, tuple)):
+            values = _dict({field: rows[0].get(field) for field in fieldname})
+            return values if as_dict else tuple(values.values())
+
+        return rows[0].get(fieldname)
+
+    def set_value(self, doctype, name, fieldname, value=None, **kwargs):
+        stats.db_calls += 1
+        updates = fieldname if isinstance(fieldname, dict) else {fieldname: value}
+        filters = name if isinstance(name, dict) else {"name": name}
+        for row in self.get_rows(doctype, filters):
+            row.update(updates)
+
+    def exists(self, doctype, filters=None, **kwargs):
+        stats.db_calls += 1
+        if isinstance(filters, str):
+            filters = {"name": filters}
+        rows = self.get_rows(doctype, filters)
+        return rows[0].name if rows else None
+
+    def count(self, doctype, filters=None, **kwargs):
+        stats.db_calls += 1
+        return len(self.get_rows(doctype, filters))
+
+    def commit(self):
+        stats.db_calls += 1
+
+    def rollback(self):
+        stats.db_calls += 1
+
+    def add_index(self, *args, **kwargs):
+        pass
+
+
+def get_all(doctype, filters=None, fields=None, order_by=None, limit=None, limit_page_length=None, pluck=None, **kwargs):
+    stats.db_calls += 1
+    rows = db.get_rows(doctype, filters)
+
+    if order_by:
+        for clause in reversed([clause.strip() for clause in order_by.split(",")]):
+            fieldname, _, direction = clause.partition(" ")
+            rows = sorted(rows, key=lambda row: (row.get(fieldname) is None, row.get(fieldname)),
+                reverse=direction.strip().lower() == "desc")
+
+    limit = limit or limit_page_length
+    if limit:
+        rows = rows[:limit]
+
+    if pluck:
+        return [row.get(pluck) for row in rows]
+
+    fields = fields or ["name"]
+    return [_dict({field: row.get(field) for field in fields}) for row in rows]
+
+
+class Document(_dict):
+    """Minimal frappe Document: attribute access, child tables and save"""
+
+    child_tables = {
+        "Purchase Invoice": {"items": "Purchase Invoice Item"},
+        "Purchase Estimate": {"items": "Purchase Estimate Item"},
+        "Seasonal Promotion": {
+            "applicable_items": "Seasonal Promotion Item",
+            "supplier_list": "Seasonal Promotion Supplier"
+        }
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        values = args[0] if args and isinstance(args[0], dict) else kwargs
+        for key, value in values.items():
+            if isinstance(value, list):
+                value = [Document(row) if isinstance(row, dict) else row for row in value]
+            self[key] = value
+
+    def append(self, fieldname, value=None):
+        row = Document(value or {})
+        row.doctype = self.child_tables.get(self.doctype, {}).get(fieldname)
+        self.setdefault(fieldname, []).append(row)
+        return row
+
+    def precision(self, fieldname, parentfield=None):
+        # Currency fields default to 2 decimals, as in ERPNext
+        return 2 if fieldname in ("rate", "amount", "discount_amount") else None
+
+    def get_doc_before_save(self):
+        return None
+
+    def run_method(self, method, *args, **kwargs):
+        handler = getattr(self, method, None)
+        return handler(*args, **kwargs) if handler else None
+
+    def insert(self, ignore_permissions=False, **kwargs):
+        return self.save()
+
+    def save(self, ignore_permissions=False, **kwargs):
+        for event in ("validate", "before_save"):
+            self.run_method(event)
+            for handler in doc_hooks.get(self.doctype, {}).get(event, []):
+                handler(self, event)
+
+        if not self.name:
+            self.name = f"{self.doctype}-{len(db.tables.get(self.doctype, [])) + 1}"
+
+        # One write for the parent, one per child row, as frappe does
+        stats.db_calls += 1 + sum(len(rows) for rows in self.child_rows().values())
+        db.tables.setdefault(self.doctype, [])
+        db.tables[self.doctype] = [row for row in db.tables[self.doctype] if row.get("name") != self.name]
+        db.tables[self.doctype].append(self)
+        return self
+
+    def submit(self):
+        self.docstatus = 1
+        return self.save()
+
+    def child_rows(self):
+        return {
+            fieldname: self.get(fieldname) or []
+            for fieldname in self.child_tables.get(self.doctype, {})
+        }
+
+
+doc_hooks = {}
+controllers = {}
+
+
+def get_doc(doctype, name=None, **kwargs):
+    if isinstance(doctype, dict):
+        return _make_doc(doctype)
+
+    stats.db_calls += 1 + len(Document.child_tables.get(doctype, {}))
+    rows = db.get_rows(doctype, {"name": name})
+    if not rows:
+        raise DoesNotExistError(f"{doctype} {name} not found")
+
+    return _make_doc(dict(rows[0], doctype=doctype))
+
+
+def new_doc(doctype, **kwargs):
+    return _make_doc({"doctype": doctype})
+
+
+def _make_doc(values):
+    controller = controllers.get(values.get("doctype"), Document)
+    return controller(values)
+
+
+class ValidationError(Exception):
+    pass
+
+
+class PermissionError(Exception):
+    pass
+
+
+class DoesNotExistError(Exception):
+    pass
+
+
+def throw(msg, exc=ValidationError, title=None, **kwargs):
+    raise exc(msg)
+
+
+def _(text, *args, **kwargs):
+    return text
+
+
+def whitelist(*args, **kwargs):
+    if args and callable(args[0]):
+        return args[0]
+    return lambda fn: fn
+
+
+def generate_hash(txt=None, length=None):
+    return hashlib.sha1(str(random.random()).encode()).hexdigest()[:length or 40]
+
+
+def as_json(obj, indent=1, **kwargs):
+    return json.dumps(obj, indent=indent, sort_keys=True, default=str)
+
+
+def parse_json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class _Logger:
+    def info(self, *args, **kwargs):
+        pass
+
+    warning = error = debug = info
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+# frappe.utils
+
+def flt(value, precision=None, rounding_method=None):
+    if isinstance(value, str):
+        value = value.replace(",", "")
+    try:
+        value = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+    if precision is not None:
+        value = float(Decimal(repr(value)).quantize(Decimal(1).scaleb(-precision), rounding=ROUND_HALF_UP))
+    return value
+
+
+def cint(value, default=0):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return default
+
+
+def cstr(value, encoding="utf-8"):
+    return "" if value is None else str(value)
+
+
+today_value = datetime.date.today()
+
+
+def nowdate():
+    return today_value.isoformat()
+
+
+def getdate(value=None):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10]) if value else today_value
+
+
+def add_days(date, days):
+    return (getdate(date) + datetime.timedelta(days=days)).isoformat()
+
+
+def get_first_day(date):
+    return getdate(date).replace(day=1)
+
+
+def now():
+    return datetime.datetime.now().isoformat(sep=" ")
+
+
+def install():
+    """Register the stand-in as `frappe` in sys.modules"""
+    frappe = types.ModuleType("frappe")
+    frappe.__dict__.update({
+        "_": _,
+        "_dict": _dict,
+        "db": db,
+        "conf": _dict(),
+        "session": _dict(user="Administrator"),
+        "flags": _dict(),
+        "local": _dict(),
+        "cache": lambda: cache,
+        "get_all": get_all,
+        "get_list": get_all,
+        "get_doc": get_doc,
+        "new_doc": new_doc,
+        "throw": throw,
+        "msgprint": _noop,
+        "log_error": _noop,
+        "logger": lambda *args, **kwargs: _Logger(),
+        "publish_realtime": _noop,
+        "enqueue": _noop,
+        "sendmail": _noop,
+        "whitelist": whitelist,
+        "has_permission": lambda *args, **kwargs: True,
+        "only_for": _noop,
+        "generate_hash": generate_hash,
+        "as_json": as_json,
+        "parse_json": parse_json,
+        "ValidationError": ValidationError,
+        "PermissionError": PermissionError,
+        "DoesNotExistError": DoesNotExistError,
+    })
+
+    utils = types.ModuleType("frappe.utils")
+    utils.__dict__.update({
+        "flt": flt, "cint": cint, "cstr": cstr, "nowdate": nowdate, "today": nowdate,
+        "getdate": getdate, "add_days": add_days, "now": now, "get_first_day": get_first_day,
+        "formatdate": lambda value, *args, **kwargs: cstr(value),
+    })
+
+    model = types.ModuleType("frappe.model")
+    document = types.ModuleType("frappe.model.document")
+    document.Document = Document
+
+    frappe.utils = utils
+    frappe.model = model
+    model.document = document
+
+    sys.modules.update({
+        "frappe": frappe,
+        "frappe.utils": utils,
+        "frappe.model": model,
+        "frappe.model.document": document,
+    })
+
+    return frappe
+
+
+db = InMemoryDatabase()
+cache = InMemoryCache()
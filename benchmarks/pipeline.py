@@ -0,0 +1,151 @@
+"""
+Purchase discount pipeline benchmarks
+Times each stage of the purchase doc hooks against the in-process frappe
+stand-in and reports wall time, database round trips and peak memory.
+"""
+
+import argparse
+import importlib
+import json
+import time
+import tracemalloc
+
+from cashiercounter.benchmarks import frappe_standin
+from cashiercounter.benchmarks.fixtures import load_fixtures, make_document
+from cashiercounter.benchmarks.frappe_standin import db, stats
+
+import frappe
+from cashiercounter import hooks
+from cashiercounter.purchase.discount_calculations import DiscountCalculator, convert_estimate_to_invoice
+from cashiercounter.purchase.doctype.purchase_estimate.purchase_estimate import PurchaseEstimate
+
+
+DEFAULT_ROWS = [10, 100, 1000, 10000]
+
+
+def register_hooks():
+    """Wire doc_events from hooks.py and doctype controllers into the stand-in"""
+    frappe_standin.controllers["Purchase Estimate"] = PurchaseEstimate
+    frappe_standin.doc_hooks.clear()
+
+    for doctype, events in hooks.doc_events.items():
+        for event, methods in events.items():
+            for method in methods if isinstance(methods, list) else [methods]:
+                module_name, _, function_name = method.rpartition(".")
+                module = importlib.import_module(module_name)
+                frappe_standin.doc_hooks.setdefault(doctype, {}).setdefault(event, []).append(
+                    getattr(module, function_name)
+                )
+
+
+def get_stages(rows):
+    """Get (stage name, prepare) pairs; prepare() sets up state and returns the timed callable"""
+    item_codes, suppliers = load_fixtures(rows)
+
+    def invoice():
+        return make_document("Purchase Invoice", rows, item_codes, suppliers[0])
+
+    def discounts_cold():
+        frappe_standin.cache.clear()
+        doc = invoice()
+        return lambda: DiscountCalculator(doc).apply_all_discounts()
+
+    def discounts_warm():
+        DiscountCalculator(invoice()).apply_all_discounts()
+        doc = invoice()
+        return lambda: DiscountCalculator(doc).apply_all_discounts()
+
+    def discounts_resave():
+        doc = invoice()
+        DiscountCalculator(doc).apply_all_discounts()
+        doc["items"][0].qty += 1
+        return lambda: DiscountCalculator(doc).apply_all_discounts()
+
+    def estimate_totals():
+        doc = make_document("Purchase Estimate", rows, item_codes, suppliers[0])
+        return lambda: doc.calculate_totals()
+
+    def convert_estimate():
+        doc = make_document("Purchase Estimate", rows, item_codes, suppliers[0])
+        doc.name = f"PE-BENCH-{rows}"
+        doc.docstatus = 1
+        db.insert("Purchase Estimate", doc)
+        return lambda: convert_estimate_to_invoice(doc.name)
+
+    return [
+        ("apply_discounts (cold cache)", discounts_cold),
+        ("apply_discounts (warm cache)", discounts_warm),
+        ("apply_discounts (one row edited)", discounts_resave),
+        ("PurchaseEstimate.calculate_totals", estimate_totals),
+        ("convert_estimate_to_invoice", convert_estimate),
+    ]
+
+
+def measure(prepare, repeat=3):
+    """Best wall time and round trips of `repeat` runs, then peak memory of one traced run"""
+    best = None
+    for _ in range(repeat):
+        run = prepare()
+        stats.reset()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, stats.db_calls, stats.cache_calls)
+
+    run = prepare()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(best[0] * 1000, 3),
+        "db_calls": best[1],
+        "cache_calls": best[2],
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def run(row_counts, repeat=3, columnar_threshold=0):
+    """Run every stage for every document size and return the result rows"""
+    register_hooks()
+    frappe.conf.purchase_columnar_discount_threshold = columnar_threshold
+
+    results = []
+    for rows in row_counts:
+        for stage, prepare in get_stages(rows):
+            results.append(dict(rows=rows, stage=stage, **measure(prepare, repeat)))
+
+    return results
+
+
+def print_table(results):
+    print(f"{'rows':>6}  {'stage':<36}{'wall ms':>11}{'db':>7}{'cache':>7}{'peak KiB':>11}")
+    for result in results:
+        print(
+            f"{result['rows']:>6}  {result['stage']:<36}{result['wall_ms']:>11.3f}"
+            f"{result['db_calls']:>7}{result['cache_calls']:>7}{result['peak_kib']:>11.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the purchase discount pipeline")
+    parser.add_argument("--rows", default=",".join(map(str, DEFAULT_ROWS)),
+        help="comma-separated document sizes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, best is reported")
+    parser.add_argument("--columnar-threshold", type=int, default=0,
+        help="purchase_columnar_discount_threshold to benchmark with (0 = row loop)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(
+        [int(rows) for rows in args.rows.split(",")],
+        repeat=args.repeat,
+        columnar_threshold=args.columnar_threshold
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        print_table(results)
@@ -0,0 +1,98 @@
+"""
+Cashier Collection Summary
+Aggregates submitted Cashier Collections for the collection dashboards, so
+every dashboard entry point shares one query and one set of filter semantics.
+
+Figures are read from the Cashier Collection Rollup, which holds one row per
+posting date, cashier and payment mode. Summaries are cached under their
+normalized filters and a generation token that every submit and cancel
+replaces once committed, so cached figures never outlive a change.
+"""
+
+import frappe
+from frappe.utils import cint, cstr, flt, getdate
+
+
+GENERATION_KEY = "cashier_collection_summary_generation"
+SUMMARY_CACHE_TTL = 3600
+
+
+def get_collection_conditions(from_date=None, to_date=None, cashier=None):
+    """Get the WHERE clause and values for the dashboard filters
+    
+    The rollup only holds submitted collections. Either date bound may be
+    omitted, and the cashier is the user who created the collection.
+    """
+    conditions = ["1 = 1"]
+    values = {}
+    
+    if from_date:
+        conditions.append("posting_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    
+    if to_date:
+        conditions.append("posting_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+    
+    if cashier:
+        conditions.append("cashier = %(cashier)s")
+        values["cashier"] = cashier
+    
+    return " AND ".join(conditions), values
+
+
+def get_collection_summary(from_date=None, to_date=None, cashier=None):
+    """Get collected total, discount and entry count, from cache when the filters were seen before"""
+    frappe.has_permission("Cashier Collection", "read", throw=True)
+    cache_key = get_summary_cache_key(from_date, to_date, cashier)
+    
+    summary = frappe.cache().get_value(cache_key)
+    if summary is None:
+        summary = query_collection_summary(from_date, to_date, cashier)
+        frappe.cache().set_value(cache_key, summary, expires_in_sec=SUMMARY_CACHE_TTL)
+    
+    return summary
+
+
+def query_collection_summary(from_date=None, to_date=None, cashier=None):
+    """Get collected total, discount and entry count with one aggregate query over the rollup"""
+    conditions, values = get_collection_conditions(from_date, to_date, cashier)
+    
+    data = frappe.db.sql(f"""
+        SELECT
+            SUM(total) as total,
+            SUM(discount) as discount,
+            SUM(collection_count) as count
+        FROM `tabCashier Collection Rollup`
+        WHERE {conditions}
+    """, values, as_dict=True)[0]
+    
+    return {
+        "total": flt(data.total),
+        "discount": flt(data.discount),
+        "count": cint(data.count)
+    }
+
+
+def get_summary_cache_key(from_date=None, to_date=None, cashier=None):
+    """Get the cache key for normalized filters under the current generation"""
+    from_date = cstr(getdate(from_date)) if from_date else ""
+    to_date = cstr(getdate(to_date)) if to_date else ""
+    
+    return f"cashier_collection_summary:{get_summary_generation()}:{from_date}:{to_date}:{cstr(cashier)}"
+
+
+def get_summary_generation():
+    """Get the token identifying the current state of collection figures"""
+    generation = frappe.cache().get_value(GENERATION_KEY)
+    if not generation:
+        generation = bump_summary_generation()
+    
+    return generation
+
+
+def bump_summary_generation(*args, **kwargs):
+    """Start a new generation, invalidating every cached summary"""
+    generation = frappe.generate_hash(length=10)
+    frappe.cache().set_value(GENERATION_KEY, generation)
+    return generation
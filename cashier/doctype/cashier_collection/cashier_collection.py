@@ -1,10 +1,18 @@
 import frappe
 from frappe.model.document import Document
 from frappe import _
+from frappe.utils import cint, flt
+from cashiercounter.cashier.doctype.cashier_collection_rollup.cashier_collection_rollup import update_collection_rollup
+from cashiercounter.cashier.doctype.cashier_invoice_reservation.cashier_invoice_reservation import (
+    RESERVED_ROW_CONDITION, release_invoice_reservations, reserve_invoice
+)
+PAYMENT_CHUNK_SIZE = 20
 class CashierCollection(Document):
     def validate(self):
         self.calculate_totals()
         self.prevent_duplicate_invoices()
+        self.reserve_invoices()
+        self.validate_invoices()
         self.ensure_ledgers_selected()
     def calculate_totals(self):
         total = sum(row.received or 0 for row in self.collection_table)
@@ -18,17 +26,123 @@ class CashierCollection(Document):
             if row.invoice in seen:
                 frappe.throw(_("Duplicate Sales Invoice: {0}").format(row.invoice))
             seen.add(row.invoice)
+    def reserve_invoices(self):
+        invoices = sorted({row.invoice for row in self.collection_table if row.invoice})
+        # Give back invoices whose rows were removed since the last save
+        previous = self.get_doc_before_save()
+        if previous:
+            release_invoice_reservations(self.name, {row.invoice for row in previous.collection_table if row.invoice} - set(invoices))
+        if not invoices:
+            return
+        # Lock the invoices in name order so concurrent collections on the same invoices serialize without deadlocking
+        frappe.db.sql("""
+            SELECT name FROM `tabSales Invoice`
+            WHERE name IN %(invoices)s
+            ORDER BY name
+            FOR UPDATE
+        """, {"invoices": invoices})
+        # Claim one reservation row per invoice; submitted rows give theirs back once posted,
+        # and outstanding_amount then guards the invoice
+        clashes = []
+        for invoice in invoices:
+            holder = reserve_invoice(invoice, self.name)
+            if holder:
+                clashes.append(_("Sales Invoice {0} is already being collected in Cashier Collection {1}").format(invoice, holder))
+        if clashes:
+            frappe.throw("<br>".join(clashes), title=_("Duplicate Sales Invoice"))
+    def validate_invoices(self):
+        # Check every referenced invoice with one query and report all bad rows together
+        rows = [row for row in self.collection_table if row.invoice]
+        if not rows:
+            return
+        invoices = {
+            invoice.name: invoice
+            for invoice in frappe.get_all(
+                "Sales Invoice",
+                filters={"name": ["in", [row.invoice for row in rows]]},
+                fields=["name", "customer", "docstatus", "outstanding_amount"]
+            )
+        }
+        errors = []
+        for row in rows:
+            invoice = invoices.get(row.invoice)
+            if flt(row.received) <= 0:
+                errors.append(_("Row {0}: Received amount for Sales Invoice {1} must be greater than zero").format(row.idx, row.invoice))
+            elif not invoice:
+                errors.append(_("Row {0}: Sales Invoice {1} does not exist").format(row.idx, row.invoice))
+            elif invoice.docstatus != 1:
+                errors.append(_("Row {0}: Sales Invoice {1} is not submitted").format(row.idx, row.invoice))
+            elif self.customer and invoice.customer != self.customer:
+                errors.append(_("Row {0}: Sales Invoice {1} belongs to customer {2}").format(row.idx, row.invoice, invoice.customer))
+            elif flt(invoice.outstanding_amount) <= 0:
+                errors.append(_("Row {0}: Sales Invoice {1} is already paid").format(row.idx, row.invoice))
+            elif flt(row.received) > flt(invoice.outstanding_amount):
+                errors.append(_("Row {0}: Received amount {1} exceeds outstanding amount {2} of Sales Invoice {3}").format(
+                    row.idx, row.received, invoice.outstanding_amount, row.invoice))
+        if errors:
+            frappe.throw("<br>".join(errors), title=_("Invalid Invoices"))
     def ensure_ledgers_selected(self):
         if not self.paid_from or not self.paid_to:
-            frappe.throw(_("Please select both 'Paid From' and 'Paid To' accounts before
-        submitting."))
+            frappe.throw(_("Please select both 'Paid From' and 'Paid To' accounts before submitting."))
     def on_submit(self):
-        self.create_payment_entries()
+        update_collection_rollup(self)
+        enqueue_payment_posting(self.name)
+    def on_cancel(self):
+        update_collection_rollup(self, sign=-1)
+        release_invoice_reservations(self.name, {row.invoice for row in self.collection_table if row.invoice})
+    def on_trash(self):
+        release_invoice_reservations(self.name, {row.invoice for row in self.collection_table if row.invoice})
     def create_payment_entries(self):
-        for row in self.collection_table:
-            if row.received > 0:
-                self.create_payment_entry(row)
-    def create_payment_entry(self, row):
+        if self.docstatus != 1:
+            return
+        # Rows that already have a Payment Entry were posted by an earlier attempt
+        rows = [row for row in self.collection_table if (row.received or 0) > 0 and not row.get("payment_entry")]
+        if not rows:
+            return
+        # Payment Entries are posted against each invoice's own receivable account. With a single entry
+        # enabled, rows are grouped into one entry per account, all committed together; otherwise one
+        # entry per row, committed in chunks
+        accounts = self.get_receivable_accounts(rows)
+        if cint(frappe.conf.get("cashier_single_payment_entry")):
+            groups = {}
+            for row in rows:
+                groups.setdefault(accounts.get(row.invoice) or self.paid_from, []).append(row)
+            chunks = [list(groups.items())]
+        else:
+            chunks = [
+                [(accounts.get(row.invoice) or self.paid_from, [row]) for row in rows[start:start + PAYMENT_CHUNK_SIZE]]
+                for start in range(0, len(rows), PAYMENT_CHUNK_SIZE)
+            ]
+        posted = 0
+        for chunk in chunks:
+            # Lock the collection so a cancel either lands before this chunk or waits for its commit
+            if frappe.db.get_value(self.doctype, self.name, "docstatus", for_update=True) != 1:
+                return
+            for paid_from, entry_rows in chunk:
+                payment_entry = self.create_payment_entry(entry_rows, paid_from)
+                for row in entry_rows:
+                    row.db_set("payment_entry", payment_entry, update_modified=False)
+                release_invoice_reservations(self.name, {row.invoice for row in entry_rows})
+                posted += len(entry_rows)
+            frappe.db.commit()
+            frappe.publish_progress(
+                posted * 100 / len(rows),
+                title=_("Posting Payment Entries"),
+                doctype=self.doctype,
+                docname=self.name,
+                description=_("{0} of {1} rows posted").format(posted, len(rows))
+            )
+    def get_receivable_accounts(self, rows):
+        return {
+            invoice.name: invoice.debit_to
+            for invoice in frappe.get_all(
+                "Sales Invoice",
+                filters={"name": ["in", [row.invoice for row in rows]]},
+                fields=["name", "debit_to"]
+            )
+        }
+    def create_payment_entry(self, rows, paid_from):
+        paid_amount = sum(row.received for row in rows)
         pe = frappe.get_doc({
             "doctype": "Payment Entry",
             "payment_type": "Receive",
@@ -37,16 +151,52 @@ class CashierCollection(Document):
             "mode_of_payment": self.payment_mode,
             "party_type": "Customer",
             "party": self.customer,
-            "paid_from": self.paid_from,
+            "paid_from": paid_from,
             "paid_to": self.paid_to,
-            "paid_amount": row.received,
-            "received_amount": row.received,
+            "paid_amount": paid_amount,
+            "received_amount": paid_amount,
             "references": [{
                 "reference_doctype": "Sales Invoice",
                 "reference_name": row.invoice,
                 "allocated_amount": row.received
-            }],
+            } for row in rows],
             "custom_cashier_collection": self.name
         })
         pe.insert(ignore_permissions=True)
-        pe.submit()
\ No newline at end of file
+        pe.submit()
+        return pe.name
+def enqueue_payment_posting(name):
+    frappe.enqueue(
+        "cashiercounter.cashier.doctype.cashier_collection.cashier_collection.post_payment_entries",
+        queue="long",
+        job_id=f"cashier_collection_payments_{name}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        name=name
+    )
+def post_payment_entries(name):
+    doc = frappe.get_doc("Cashier Collection", name)
+    # Cancelled collections have already left the rollup and must not be posted
+    if doc.docstatus != 1:
+        return
+    try:
+        doc.create_payment_entries()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Error posting payment entries for {name}: {str(e)}")
+        frappe.publish_realtime(
+            "msgprint",
+            _("Posting Payment Entries for {0} failed and can be retried: {1}").format(name, str(e)),
+            doctype=doc.doctype,
+            docname=name
+        )
+    doc.notify_update()
+@frappe.whitelist()
+def retry_payment_posting(name):
+    doc = frappe.get_doc("Cashier Collection", name)
+    doc.check_permission("submit")
+    if doc.docstatus != 1:
+        frappe.throw(_("Only submitted Cashier Collections can have their Payment Entries posted"))
+    enqueue_payment_posting(name)
+def on_doctype_update():
+    frappe.db.add_index("Cashier Collection", ["posting_date", "owner"])
\ No newline at end of file
@@ -1,9 +1,13 @@
 # Copyright (c) 2025, Lavanya Emart and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class CashierCollectionInvoice(Document):
 	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Cashier Collection Invoice", ["invoice", "docstatus"])
@@ -0,0 +1,107 @@
+# Copyright (c) 2025, Lavanya Emart and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+from cashiercounter.cashier.collection_summary import bump_summary_generation
+
+
+class CashierCollectionRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Cashier Collection Rollup", ["posting_date", "cashier"])
+
+
+def get_rollup_name(posting_date, cashier, payment_mode):
+	return f"{getdate(posting_date)}-{cashier}-{payment_mode or ''}"
+
+
+def update_collection_rollup(doc, sign=1):
+	"""Add a submitted Cashier Collection to its (posting_date, cashier, payment_mode) row, or remove it on cancel"""
+	posting_date = getdate(doc.posting_date)
+	timestamp = now()
+
+	frappe.db.sql("""
+		INSERT INTO `tabCashier Collection Rollup`
+			(name, posting_date, cashier, payment_mode, total, discount, payable_amount, collection_count,
+			creation, modified, owner, modified_by, docstatus)
+		VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 0)
+		ON DUPLICATE KEY UPDATE
+			total = total + VALUES(total),
+			discount = discount + VALUES(discount),
+			payable_amount = payable_amount + VALUES(payable_amount),
+			collection_count = collection_count + VALUES(collection_count),
+			modified = VALUES(modified)
+	""", (
+		get_rollup_name(posting_date, doc.owner, doc.payment_mode), posting_date, doc.owner, doc.payment_mode or "",
+		sign * flt(doc.amount), sign * flt(doc.discount), sign * flt(doc.payable_amount), sign,
+		timestamp, timestamp, frappe.session.user, frappe.session.user
+	))
+
+	# Invalidate cached summaries once the change is visible to other readers
+	frappe.db.after_commit.add(bump_summary_generation)
+
+	publish_collection_delta(doc, posting_date, sign)
+
+
+def publish_collection_delta(doc, posting_date, sign):
+	"""Push the change to open collection dashboards, which apply it to their totals"""
+	frappe.publish_realtime(
+		"cashier_collection_delta",
+		{
+			"posting_date": str(posting_date),
+			"cashier": doc.owner,
+			"payment_mode": doc.payment_mode,
+			"total": sign * flt(doc.amount),
+			"discount": sign * flt(doc.discount),
+			"count": sign
+		},
+		doctype="Cashier Collection",
+		after_commit=True
+	)
+
+
+def rebuild_collection_rollup(from_date=None, to_date=None):
+	"""Rebuild the rollup from submitted Cashier Collections
+
+	Usage: bench --site [site-name] rebuild-cashier-collection-rollup [--from-date DATE] [--to-date DATE]
+	"""
+	conditions = ""
+	values = {"user": frappe.session.user, "timestamp": now()}
+
+	if from_date:
+		conditions += " AND posting_date >= %(from_date)s"
+		values["from_date"] = getdate(from_date)
+
+	if to_date:
+		conditions += " AND posting_date <= %(to_date)s"
+		values["to_date"] = getdate(to_date)
+
+	frappe.db.sql(f"""
+		DELETE FROM `tabCashier Collection Rollup`
+		WHERE 1 = 1 {conditions}
+	""", values)
+
+	frappe.db.sql(f"""
+		INSERT INTO `tabCashier Collection Rollup`
+			(name, posting_date, cashier, payment_mode, total, discount, payable_amount, collection_count,
+			creation, modified, owner, modified_by, docstatus)
+		SELECT
+			CONCAT(posting_date, '-', owner, '-', COALESCE(payment_mode, '')),
+			posting_date, owner, COALESCE(payment_mode, ''),
+			SUM(amount), SUM(discount), SUM(payable_amount), COUNT(*),
+			%(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0
+		FROM `tabCashier Collection`
+		WHERE docstatus = 1
+		{conditions}
+		GROUP BY posting_date, owner, COALESCE(payment_mode, '')
+	""", values)
+
+	frappe.db.commit()
+	bump_summary_generation()
+
+	return frappe.db.count("Cashier Collection Rollup")
@@ -0,0 +1,90 @@
+# Copyright (c) 2025, Lavanya Emart and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+
+# Cashier Collection Invoice rows that still hold their invoice: drafts, and submitted rows with an amount not yet posted
+RESERVED_ROW_CONDITION = "(docstatus = 0 OR (docstatus = 1 AND received > 0 AND IFNULL(payment_entry, '') = ''))"
+
+
+class CashierInvoiceReservation(Document):
+	pass
+
+
+def reserve_invoice(invoice, collection):
+	"""Reserve a Sales Invoice for a Cashier Collection, returning the collection still holding it if any
+
+	Reservations are keyed by the invoice, so claiming one is a unique-key insert or a point update
+	on an existing row, and never locks a range of invoices.
+	"""
+	timestamp = now()
+
+	try:
+		frappe.db.sql("""
+			INSERT INTO `tabCashier Invoice Reservation`
+				(name, collection, creation, modified, owner, modified_by, docstatus)
+			VALUES (%s, %s, %s, %s, %s, %s, 0)
+		""", (invoice, collection, timestamp, timestamp, frappe.session.user, frappe.session.user))
+		return None
+	except Exception as e:
+		if not frappe.db.is_duplicate_entry(e):
+			raise
+
+	holder = frappe.db.get_value("Cashier Invoice Reservation", invoice, "collection", for_update=True)
+	if holder and holder != collection and is_holding_invoice(holder, invoice):
+		return holder
+
+	frappe.db.sql("""
+		UPDATE `tabCashier Invoice Reservation`
+		SET collection = %s, modified = %s, modified_by = %s
+		WHERE name = %s
+	""", (collection, timestamp, frappe.session.user, invoice))
+
+
+def is_holding_invoice(collection, invoice):
+	"""Check whether a collection still has an unposted row for the invoice, so reservations left by
+	collections that were deleted, cancelled or posted can be taken over"""
+	return bool(frappe.db.sql(f"""
+		SELECT name FROM `tabCashier Collection Invoice`
+		WHERE parent = %s
+		AND parenttype = 'Cashier Collection'
+		AND invoice = %s
+		AND {RESERVED_ROW_CONDITION}
+		LIMIT 1
+	""", (collection, invoice)))
+
+
+def release_invoice_reservations(collection, invoices):
+	"""Release the collection's reservations on the given invoices"""
+	if not invoices:
+		return
+
+	frappe.db.sql("""
+		UPDATE `tabCashier Invoice Reservation`
+		SET collection = NULL, modified = %(timestamp)s, modified_by = %(user)s
+		WHERE name IN %(invoices)s
+		AND collection = %(collection)s
+	""", {"invoices": sorted(invoices), "collection": collection, "timestamp": now(), "user": frappe.session.user})
+
+
+def rebuild_invoice_reservations():
+	"""Rebuild reservations from the Cashier Collection Invoice rows that still hold their invoice"""
+	timestamp = now()
+
+	frappe.db.sql("DELETE FROM `tabCashier Invoice Reservation`")
+
+	frappe.db.sql(f"""
+		INSERT INTO `tabCashier Invoice Reservation`
+			(name, collection, creation, modified, owner, modified_by, docstatus)
+		SELECT invoice, MIN(parent), %(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0
+		FROM `tabCashier Collection Invoice`
+		WHERE parenttype = 'Cashier Collection'
+		AND IFNULL(invoice, '') != ''
+		AND {RESERVED_ROW_CONDITION}
+		GROUP BY invoice
+	""", {"timestamp": timestamp, "user": frappe.session.user})
+
+	frappe.db.commit()
@@ -11,7 +11,7 @@ frappe.pages['cashier_collection_dashboard'] = {
             fieldtype: 'Date',
             fieldname: 'from_date',
             default: frappe.datetime.add_days(frappe.datetime.get_today(), -7),
-            change() { load_data(); }
+            change() { reload(); }
         });
 
         page.add_field({
@@ -19,7 +19,7 @@ frappe.pages['cashier_collection_dashboard'] = {
             fieldtype: 'Date',
             fieldname: 'to_date',
             default: frappe.datetime.get_today(),
-            change() { load_data(); }
+            change() { reload(); }
         });
 
         page.add_field({
@@ -27,10 +27,21 @@ frappe.pages['cashier_collection_dashboard'] = {
             fieldtype: 'Link',
             options: 'User',
             fieldname: 'cashier',
-            change() { load_data(); }
+            change() { reload(); }
         });
 
         let container = page.body;
+        let summary = null;
+        let filters = {};
+
+        function render() {
+            let html = `
+                <h3>Total Collected: ₹${summary.total || 0}</h3>
+                <p>Discounts Given: ₹${summary.discount || 0}</p>
+                <p>Entries: ${summary.count}</p>
+            `;
+            container.innerHTML = html;
+        }
 
         function load_data() {
             let from_date = page.fields_dict.from_date.get_value();
@@ -38,19 +49,35 @@ frappe.pages['cashier_collection_dashboard'] = {
             let cashier = page.fields_dict.cashier.get_value();
 
             frappe.call({
-                method: 'cashiercounter.cashier.dashboard.cashier_collection_dashboard.get_summary',
+                method: 'cashiercounter.cashier.page.cashier_collection_dashboard.cashier_collection_dashboard.get_summary',
                 args: { from_date, to_date, cashier },
                 callback(r) {
-                    let html = `
-                        <h3>Total Collected: ₹${r.message.total || 0}</h3>
-                        <p>Discounts Given: ₹${r.message.discount || 0}</p>
-                        <p>Entries: ${r.message.count}</p>
-                    `;
-                    container.innerHTML = html;
+                    filters = { from_date, to_date, cashier };
+                    summary = r.message;
+                    render();
                 }
             });
         }
 
+        // Coalesce bursts of filter changes into one request
+        let reload = frappe.utils.debounce(load_data, 300);
+
+        // Apply submit / cancel deltas pushed by the server instead of re-querying
+        frappe.realtime.doctype_subscribe('Cashier Collection');
+        frappe.realtime.on('cashier_collection_delta', function(delta) {
+            if (!summary
+                || (filters.from_date && delta.posting_date < filters.from_date)
+                || (filters.to_date && delta.posting_date > filters.to_date)
+                || (filters.cashier && delta.cashier !== filters.cashier)) {
+                return;
+            }
+
+            summary.total = flt(summary.total) + flt(delta.total);
+            summary.discount = flt(summary.discount) + flt(delta.discount);
+            summary.count = cint(summary.count) + cint(delta.count);
+            render();
+        });
+
         load_data();
     }
 };
\ No newline at end of file
@@ -1,24 +1,7 @@
 import frappe
 
+from cashiercounter.cashier.collection_summary import get_collection_summary
+
 @frappe.whitelist()
 def get_summary(from_date, to_date, cashier=None):
-    filters = {
-        "posting_date": ["between", [from_date, to_date]]
-    }
-    if cashier:
-        filters["owner"] = cashier
-
-    data = frappe.get_all(
-        "Cashier Collection",
-        filters=filters,
-        fields=["discount_amount", "total_amount"]
-    )
-
-    total = sum(d.total_amount or 0 for d in data)
-    discount = sum(d.discount_amount or 0 for d in data)
-
-    return {
-        "total": total,
-        "discount": discount,
-        "count": len(data)
-    }
\ No newline at end of file
+    return get_collection_summary(from_date, to_date, cashier)
\ No newline at end of file
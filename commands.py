@@ -0,0 +1,65 @@
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-supplier-turnover-ledger")
+@click.option("--supplier", help="Rebuild the ledger for a single supplier only")
+@pass_context
+def rebuild_supplier_turnover_ledger(context, supplier=None):
+    """Rebuild the Supplier Turnover Ledger from submitted Purchase Invoices"""
+    from cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger import (
+        rebuild_turnover_ledger,
+    )
+    
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        rows = rebuild_turnover_ledger(supplier)
+        click.echo(f"Rebuilt Supplier Turnover Ledger: {rows} rows")
+    finally:
+        frappe.destroy()
+
+
+@click.command("rebuild-supplier-monthly-purchase")
+@click.option("--supplier", help="Rebuild the rollup for a single supplier only")
+@pass_context
+def rebuild_supplier_monthly_purchase(context, supplier=None):
+    """Rebuild the Supplier Monthly Purchase rollup from submitted Purchase Invoices"""
+    from cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase import (
+        rebuild_monthly_purchase,
+    )
+    
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        rows = rebuild_monthly_purchase(supplier)
+        click.echo(f"Rebuilt Supplier Monthly Purchase: {rows} rows")
+    finally:
+        frappe.destroy()
+
+
+@click.command("rebuild-cashier-collection-rollup")
+@click.option("--from-date", help="Rebuild rows from this posting date only")
+@click.option("--to-date", help="Rebuild rows up to this posting date only")
+@pass_context
+def rebuild_cashier_collection_rollup(context, from_date=None, to_date=None):
+    """Rebuild the Cashier Collection Rollup from submitted Cashier Collections"""
+    from cashiercounter.cashier.doctype.cashier_collection_rollup.cashier_collection_rollup import (
+        rebuild_collection_rollup,
+    )
+    
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        rows = rebuild_collection_rollup(from_date, to_date)
+        click.echo(f"Rebuilt Cashier Collection Rollup: {rows} rows")
+    finally:
+        frappe.destroy()
+
+
+commands = [
+    rebuild_supplier_turnover_ledger,
+    rebuild_supplier_monthly_purchase,
+    rebuild_cashier_collection_rollup
+]
@@ -15,11 +15,22 @@ app_include_js = [
 doc_events = {
     "Purchase Invoice": {
         "validate": "cashiercounter.purchase.discount_calculations.apply_discounts",
-        "before_save": "cashiercounter.purchase.discount_calculations.validate_purchase_estimate"
+        "before_save": "cashiercounter.purchase.discount_calculations.validate_purchase_estimate",
+        "on_submit": [
+            "cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger.update_turnover_ledger",
+            "cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase.update_monthly_purchase"
+        ],
+        "on_cancel": [
+            "cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger.update_turnover_ledger",
+            "cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase.update_monthly_purchase"
+        ]
     },
     "Purchase Estimate": {
         "validate": "cashiercounter.purchase.discount_calculations.apply_discounts",
         "before_save": "cashiercounter.purchase.discount_calculations.validate_purchase_estimate"
+    },
+    "Supplier": {
+        "on_update": "cashiercounter.purchase.discount_calculations.bump_rule_set_version_on_commit"
     }
 }
 
@@ -31,6 +42,9 @@ scheduler_events = {
     ],
     "weekly": [
         "cashiercounter.purchase.tasks.calculate_turnover_incentives"
+    ],
+    "daily_long": [
+        "cashiercounter.purchase.tasks.cleanup_old_records"
     ]
 }
 
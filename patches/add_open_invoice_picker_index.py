@@ -0,0 +1,11 @@
+import frappe
+
+
+def execute():
+    # Covering index for the cashier open-invoice picker: filter on customer and
+    # docstatus, keyset order on (due_date, name), and the returned columns
+    frappe.db.add_index(
+        "Sales Invoice",
+        ["customer", "docstatus", "due_date", "name", "outstanding_amount", "posting_date"],
+        index_name="cashier_open_invoice_index"
+    )
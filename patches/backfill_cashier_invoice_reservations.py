@@ -0,0 +1,6 @@
+from cashiercounter.cashier.doctype.cashier_invoice_reservation.cashier_invoice_reservation import rebuild_invoice_reservations
+
+
+def execute():
+    # Reserve the invoices already held by draft and unposted collections, which predate reservation rows
+    rebuild_invoice_reservations()
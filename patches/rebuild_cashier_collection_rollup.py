@@ -0,0 +1,6 @@
+from cashiercounter.cashier.doctype.cashier_collection_rollup.cashier_collection_rollup import rebuild_collection_rollup
+
+
+def execute():
+    # Backfill the rollup from existing collections so the dashboards do not read an empty rollup
+    rebuild_collection_rollup()
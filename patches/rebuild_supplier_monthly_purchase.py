@@ -0,0 +1,6 @@
+from cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase import rebuild_monthly_purchase
+
+
+def execute():
+    # Backfill the rollup from existing invoices so Purchase Analytics does not read an empty rollup
+    rebuild_monthly_purchase()
@@ -0,0 +1,6 @@
+from cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger import rebuild_turnover_ledger
+
+
+def execute():
+    # Backfill the ledger from existing invoices so incentives do not read an empty ledger
+    rebuild_turnover_ledger()
@@ -0,0 +1,10 @@
+import frappe
+from frappe.model.utils.rename_field import rename_field
+
+
+def execute():
+    # The collection controller reads invoice and received; move existing
+    # values over from the old sales_invoice and amount columns
+    for old_fieldname, new_fieldname in (("sales_invoice", "invoice"), ("amount", "received")):
+        if frappe.db.has_column("Cashier Collection Invoice", old_fieldname):
+            rename_field("Cashier Collection Invoice", old_fieldname, new_fieldname)
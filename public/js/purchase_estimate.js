@@ -174,13 +174,24 @@ function calculate_estimate_discounts(frm) {
     if (!frm.doc.apply_discount) return;
     
     frappe.call({
-        method: 'cashiercounter.purchase.discount_calculations.apply_discounts',
+        method: 'cashiercounter.purchase.discount_calculations.preview_discounts',
         args: {
-            doc: frm.doc
+            payload: {
+                supplier: frm.doc.supplier,
+                discount_type: frm.doc.discount_type,
+                items: (frm.doc.items || []).map(item => ({
+                    item_code: item.item_code,
+                    qty: item.qty,
+                    rate: item.rate,
+                    amount: item.amount,
+                    discount_percentage: item.discount_percentage,
+                    undiscounted_rate: item.undiscounted_rate
+                }))
+            }
         },
         callback: function(r) {
             if (r.message) {
-                frm.refresh_fields();
+                apply_estimate_discount_preview(frm, r.message);
                 frappe.show_alert({
                     message: __('Estimate discounts calculated'),
                     indicator: 'green'
@@ -190,6 +201,23 @@ function calculate_estimate_discounts(frm) {
     });
 }
 
+function apply_estimate_discount_preview(frm, preview) {
+    // Preview figures are shown without changing rates; the server applies them on save
+    (frm.doc.items || []).forEach((item, idx) => {
+        let row = preview.items[idx];
+        if (!row) return;
+        
+        item.discount_percentage = row.discount_percentage;
+        item.discount_amount = row.discount_amount;
+        item.promotion_applied = row.promotion_applied || '';
+    });
+    
+    frm.doc.total_discount_amount = preview.total_discount_amount;
+    frm.doc.effective_discount_percentage = preview.effective_discount_percentage;
+    
+    frm.refresh_fields();
+}
+
 function apply_estimate_item_discount(frm, item) {
     // Apply item-specific discounts similar to purchase invoice
     if (frm._supplier_discounts) {
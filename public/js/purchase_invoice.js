@@ -128,14 +128,14 @@ function calculate_all_discounts(frm) {
     if (!frm.doc.apply_discount) return;
     
     frappe.call({
-        method: 'cashiercounter.purchase.discount_calculations.apply_discounts',
+        method: 'cashiercounter.purchase.discount_calculations.preview_discounts',
         args: {
-            doc: frm.doc
+            payload: get_discount_preview_payload(frm)
         },
         callback: function(r) {
             if (r.message) {
                 // Update the form with calculated values
-                frm.refresh_fields();
+                apply_discount_preview(frm, r.message);
                 
                 // Show success message
                 frappe.show_alert({
@@ -147,6 +147,40 @@ function calculate_all_discounts(frm) {
     });
 }
 
+function get_discount_preview_payload(frm) {
+    // Only the fields the discount engine reads are sent to the server
+    return {
+        supplier: frm.doc.supplier,
+        discount_type: frm.doc.discount_type,
+        items: (frm.doc.items || []).map(item => ({
+            item_code: item.item_code,
+            qty: item.qty,
+            rate: item.rate,
+            amount: item.amount,
+            discount_percentage: item.discount_percentage,
+            undiscounted_rate: item.undiscounted_rate
+        }))
+    };
+}
+
+function apply_discount_preview(frm, preview) {
+    // Preview figures are shown without changing rates; the server applies them on save
+    (frm.doc.items || []).forEach((item, idx) => {
+        let row = preview.items[idx];
+        if (!row) return;
+        
+        item.discount_percentage = row.discount_percentage;
+        item.discount_amount = row.discount_amount;
+        item.promotion_applied = row.promotion_applied || '';
+    });
+    
+    frm.doc.total_discount_amount = preview.total_discount_amount;
+    frm.doc.effective_discount_percentage = preview.effective_discount_percentage;
+    frm.doc.turnover_incentive = preview.turnover_incentive;
+    
+    frm.refresh_fields();
+}
+
 function apply_item_discount(frm, item) {
     if (!frm._supplier_discounts) return;
     
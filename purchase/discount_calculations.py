@@ -5,9 +5,15 @@ This module handles advanced discount calculations for purchase transactions.
 
 import frappe
 from frappe import _
-from frappe.utils import flt, nowdate, add_days, getdate
+from frappe.utils import flt, cstr, nowdate, getdate
+import hashlib
+from bisect import bisect_right
 from datetime import datetime
 
+from cashiercounter.purchase.columnar_discounts import get_columnar_engine
+from cashiercounter.purchase.instrumentation import DiscountInstrumentation
+from cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger import get_yearly_turnover
+
 
 class DiscountCalculator:
     """Main class for handling all discount calculations"""
@@ -16,6 +22,9 @@ class DiscountCalculator:
         self.doc = doc
         self.total_discount = 0
         self.item_wise_discounts = {}
+        self.columnar = None
+        self.items = doc.get("items", [])
+        self.rule_set_version = None
     
     def apply_all_discounts(self):
         """Apply all applicable discounts to the purchase document"""
@@ -23,33 +32,66 @@ class DiscountCalculator:
             if not self.doc.get("apply_discount"):
                 return
             
-            # Apply item-wise discounts
-            if self.doc.get("discount_type") == "Item-wise":
-                self.apply_item_wise_discounts()
-            
-            # Apply invoice-wise discounts
-            elif self.doc.get("discount_type") == "Invoice-wise":
-                self.apply_invoice_wise_discount()
-            
-            # Apply seasonal promotions
-            self.apply_seasonal_promotions()
-            
-            # Apply turnover incentives
-            self.apply_turnover_incentives()
-            
-            # Update totals
-            self.update_document_totals()
+            with DiscountInstrumentation(self.doc) as instrumentation:
+                # Only rows changed since the last calculation are recomputed
+                with instrumentation.stage("prepare"):
+                    self.rule_set_version = get_rule_set_version()
+                    self.items = self.get_items_to_recalculate()
+                    self.reset_item_discounts()
+                    
+                    # Very large documents are computed in columnar mode when enabled
+                    self.columnar = get_columnar_engine(self.items)
+                
+                # Apply item-wise discounts
+                if self.doc.get("discount_type") == "Item-wise":
+                    with instrumentation.stage("item_wise"):
+                        self.apply_item_wise_discounts()
+                
+                # Apply invoice-wise discounts
+                elif self.doc.get("discount_type") == "Invoice-wise":
+                    with instrumentation.stage("invoice_wise"):
+                        self.apply_invoice_wise_discount()
+                
+                # Apply seasonal promotions
+                with instrumentation.stage("promotions"):
+                    self.apply_seasonal_promotions()
+                    
+                    if self.columnar:
+                        self.columnar.write_back(self.item_wise_discounts)
+                    
+                    self.set_item_fingerprints()
+                
+                # Apply turnover incentives
+                with instrumentation.stage("turnover"):
+                    self.apply_turnover_incentives()
+                
+                # Update totals
+                with instrumentation.stage("totals"):
+                    # Unchanged rows keep the discount computed on a previous save
+                    self.total_discount += self.get_unchanged_items_discount()
+                    self.update_document_totals()
             
         except Exception as e:
             frappe.throw(_("Error in discount calculation: {0}").format(str(e)))
     
     def apply_item_wise_discounts(self):
         """Apply discounts at item level"""
-        for item in self.doc.get("items", []):
+        items = self.items
+        
+        # Resolve all supplier-item agreements for the document at once
+        supplier_discounts = get_supplier_discount_map(
+            self.doc.supplier, [item.item_code for item in items]
+        )
+        
+        if self.columnar:
+            self.total_discount = self.columnar.apply_item_wise_discounts(supplier_discounts, self.total_discount)
+            return
+        
+        for item in items:
             discount_rate = 0
             
             # Get supplier-specific discount
-            supplier_discount = self.get_supplier_discount(item.item_code, self.doc.supplier)
+            supplier_discount = supplier_discounts.get(item.item_code)
             if supplier_discount:
                 discount_rate += flt(supplier_discount)
             
@@ -58,6 +100,7 @@ class DiscountCalculator:
                 discount_amount = flt(item.amount) * flt(discount_rate) / 100
                 item.discount_percentage = discount_rate
                 item.discount_amount = discount_amount
+                item.undiscounted_rate = flt(item.rate)
                 item.rate = flt(item.rate) - (flt(item.rate) * flt(discount_rate) / 100)
                 
                 self.item_wise_discounts[item.item_code] = discount_amount
@@ -82,36 +125,33 @@ class DiscountCalculator:
     
     def apply_seasonal_promotions(self):
         """Apply active seasonal promotions"""
-        current_date = nowdate()
+        promotion_index = get_active_promotion_index()
+        promotions = promotion_index["promotions"]
+        all_items = promotion_index["all_items"]
         
-        # Get active promotions
-        promotions = frappe.get_all(
-            "Seasonal Promotion",
-            filters={
-                "is_active": 1,
-                "start_date": ["<=", current_date],
-                "end_date": [">=", current_date]
-            },
-            fields=["name", "promotion_name", "discount_percentage", "applicable_items"]
-        )
+        if not promotions:
+            return
         
-        for promotion in promotions:
-            promotion_doc = frappe.get_doc("Seasonal Promotion", promotion.name)
-            
-            # Check if promotion applies to current items
-            applicable_items = [item.item_code for item in promotion_doc.get("applicable_items", [])]
+        if self.columnar:
+            self.total_discount = self.columnar.apply_seasonal_promotions(promotion_index, self.total_discount)
+            return
+        
+        for item in self.items:
+            item_promotions = promotion_index["by_item"].get(item.item_code)
+            applicable = sorted(all_items + item_promotions) if item_promotions else all_items
             
-            for item in self.doc.get("items", []):
-                if not applicable_items or item.item_code in applicable_items:
-                    # Apply promotion discount
-                    promo_discount = flt(item.amount) * flt(promotion_doc.discount_percentage) / 100
-                    
-                    # Update item
-                    current_discount = flt(item.get("discount_amount", 0))
-                    item.discount_amount = current_discount + promo_discount
-                    item.promotion_applied = promotion_doc.promotion_name
-                    
-                    self.total_discount += promo_discount
+            for position in applicable:
+                promotion = promotions[position]
+                
+                # Apply promotion discount
+                promo_discount = flt(item.amount) * flt(promotion["discount_percentage"]) / 100
+                
+                # Update item
+                current_discount = flt(item.get("discount_amount", 0))
+                item.discount_amount = current_discount + promo_discount
+                item.promotion_applied = promotion["promotion_name"]
+                
+                self.total_discount += promo_discount
     
     def apply_turnover_incentives(self):
         """Apply turnover-based incentives"""
@@ -121,20 +161,10 @@ class DiscountCalculator:
         # Get supplier's yearly purchase amount
         yearly_purchase = self.get_yearly_purchase_amount(self.doc.supplier)
         
-        # Get applicable incentive schemes
-        incentives = frappe.get_all(
-            "Turnover Incentive",
-            filters={
-                "is_active": 1,
-                "min_turnover": ["<=", yearly_purchase]
-            },
-            fields=["name", "incentive_percentage", "max_incentive_amount"],
-            order_by="min_turnover desc",
-            limit=1
-        )
+        # Get applicable incentive scheme
+        incentive = get_incentive_scheme(yearly_purchase)
         
-        if incentives:
-            incentive = incentives[0]
+        if incentive:
             incentive_rate = flt(incentive.incentive_percentage)
             max_incentive = flt(incentive.max_incentive_amount)
             
@@ -161,42 +191,284 @@ class DiscountCalculator:
             # Update grand total
             self.doc.grand_total = flt(self.doc.total) - self.total_discount
     
+    def get_items_to_recalculate(self):
+        """Get rows whose fingerprint changed since discounts were last applied"""
+        return [
+            item for item in self.doc.get("items", [])
+            if item.get("discount_fingerprint") != self.get_item_fingerprint(item)
+        ]
+    
+    def get_item_fingerprint(self, item):
+        """Get a fingerprint of the row inputs and the rule set that priced them"""
+        rate_precision = get_field_precision(item, "rate")
+        qty_precision = get_field_precision(item, "qty")
+        
+        key = "|".join([
+            cstr(self.doc.supplier),
+            cstr(self.doc.get("discount_type")),
+            cstr(item.item_code),
+            repr(flt(item.qty, qty_precision)),
+            repr(flt(item.rate, rate_precision)),
+            cstr(self.rule_set_version)
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    def reset_item_discounts(self):
+        """Clear discounts on rows being recomputed so they do not stack on re-save"""
+        for item in self.items:
+            undiscounted_rate = flt(item.get("undiscounted_rate"))
+            
+            if undiscounted_rate:
+                # Restore the rate from before the item-wise discount, unless it was edited since.
+                # Compare at field precision, as the stored rate was rounded on save.
+                rate_precision = get_field_precision(item, "rate")
+                discounted_rate = undiscounted_rate - (undiscounted_rate * flt(item.discount_percentage) / 100)
+                if flt(item.rate, rate_precision) == flt(discounted_rate, rate_precision):
+                    item.rate = undiscounted_rate
+                    item.amount = flt(item.qty) * undiscounted_rate
+                
+                item.discount_percentage = 0
+                item.undiscounted_rate = 0
+            
+            item.discount_amount = 0
+            item.promotion_applied = None
+    
+    def set_item_fingerprints(self):
+        """Record the fingerprint of every recomputed row"""
+        for item in self.items:
+            item.discount_fingerprint = self.get_item_fingerprint(item)
+    
+    def get_unchanged_items_discount(self):
+        """Get the stored discount of rows that were not recomputed"""
+        recalculated = {id(item) for item in self.items}
+        return sum(
+            flt(item.discount_amount) for item in self.doc.get("items", [])
+            if id(item) not in recalculated
+        )
+    
     def get_supplier_discount(self, item_code, supplier):
         """Get supplier-specific discount for an item"""
         try:
             # Check for supplier-item specific discount
-            discount_data = frappe.db.get_value(
-                "Purchase Discount Agreement",
-                {
-                    "supplier": supplier,
-                    "item_code": item_code,
-                    "is_active": 1
-                },
-                "discount_percentage"
-            )
-            return flt(discount_data) if discount_data else 0
+            discount_map = get_supplier_discount_map(supplier, [item_code])
+            return flt(discount_map.get(item_code))
         except:
             return 0
     
     def get_yearly_purchase_amount(self, supplier):
         """Get yearly purchase amount for supplier"""
         try:
-            from_date = add_days(nowdate(), -365)
-            to_date = nowdate()
-            
-            result = frappe.db.sql("""
-                SELECT SUM(grand_total) as total
-                FROM `tabPurchase Invoice`
-                WHERE supplier = %s
-                AND posting_date BETWEEN %s AND %s
-                AND docstatus = 1
-            """, (supplier, from_date, to_date), as_dict=True)
-            
-            return flt(result[0].total) if result and result[0].total else 0
+            return get_yearly_turnover(supplier)
         except:
             return 0
 
 
+def get_field_precision(item, fieldname):
+    """Get the precision of a row field, or None when the row does not define one"""
+    return item.precision(fieldname) if callable(getattr(item, "precision", None)) else None
+
+
+SUPPLIER_DISCOUNT_CACHE_TTL = 3600
+
+
+def get_supplier_discount_map(supplier, item_codes):
+    """Get item-wise discount percentages for a supplier as {item_code: discount_percentage}
+    
+    The map is cached per supplier under `supplier_discounts_{supplier}` and is
+    cleared by Purchase Discount Agreement once its changes are committed. The
+    cache also expires after an hour, bounding how long a map cached from data a
+    commit was still changing can be served. Items not yet in the cache
+    are fetched in a single query; items without an agreement are cached as 0.
+    """
+    if not supplier:
+        return {}
+    
+    cache_key = f"supplier_discounts_{supplier}"
+    discount_map = frappe.cache().get_value(cache_key) or {}
+    
+    missing_items = {item_code for item_code in item_codes if item_code and item_code not in discount_map}
+    if missing_items:
+        agreements = frappe.get_all(
+            "Purchase Discount Agreement",
+            filters={
+                "supplier": supplier,
+                "item_code": ["in", list(missing_items)],
+                "is_active": 1
+            },
+            fields=["item_code", "discount_percentage"]
+        )
+        
+        discount_map.update(dict.fromkeys(missing_items, 0))
+        for agreement in agreements:
+            discount_map[agreement.item_code] = flt(agreement.discount_percentage)
+        
+        frappe.cache().set_value(cache_key, discount_map, expires_in_sec=SUPPLIER_DISCOUNT_CACHE_TTL)
+    
+    return discount_map
+
+
+def get_active_promotion_index():
+    """Get the compiled index of promotions active today
+    
+    Returns a dict with:
+        promotions: list of {name, promotion_name, discount_percentage}
+        all_items: positions of promotions without an item list
+        by_item: {item_code: positions of promotions listing that item}
+    
+    The index is cached under `active_promotions`, which Seasonal Promotion
+    clears and update_promotion_status pre-warms each night, and is rebuilt
+    when the date rolls over.
+    """
+    current_date = nowdate()
+    
+    promotion_index = frappe.cache().get_value("active_promotions")
+    if promotion_index and promotion_index.get("date") == current_date:
+        return promotion_index
+    
+    promotion_index = build_promotion_index(current_date)
+    frappe.cache().set_value("active_promotions", promotion_index)
+    
+    return promotion_index
+
+
+def build_promotion_index(current_date):
+    """Build the promotion index for a date with two queries"""
+    promotions = frappe.get_all(
+        "Seasonal Promotion",
+        filters={
+            "is_active": 1,
+            "start_date": ["<=", current_date],
+            "end_date": [">=", current_date]
+        },
+        fields=["name", "promotion_name", "discount_percentage"],
+        order_by="name asc"
+    )
+    
+    positions = {promotion.name: position for position, promotion in enumerate(promotions)}
+    by_item = {}
+    
+    if promotions:
+        promotion_items = frappe.get_all(
+            "Seasonal Promotion Item",
+            filters={
+                "parenttype": "Seasonal Promotion",
+                "parent": ["in", list(positions)]
+            },
+            fields=["parent", "item_code"]
+        )
+        
+        for row in promotion_items:
+            item_positions = by_item.setdefault(row.item_code, [])
+            if positions[row.parent] not in item_positions:
+                item_positions.append(positions[row.parent])
+    
+    listed = {position for item_positions in by_item.values() for position in item_positions}
+    
+    return {
+        "date": current_date,
+        "promotions": [
+            {
+                "name": promotion.name,
+                "promotion_name": promotion.promotion_name,
+                "discount_percentage": flt(promotion.discount_percentage)
+            }
+            for promotion in promotions
+        ],
+        "all_items": [position for position in range(len(promotions)) if position not in listed],
+        "by_item": {item_code: sorted(item_positions) for item_code, item_positions in by_item.items()}
+    }
+
+
+def get_incentive_tiers():
+    """Get the tier table of Turnover Incentive schemes valid today
+    
+    Returns a dict with `thresholds` (ascending min_turnover) and the matching
+    `schemes`, cached under `active_incentive_schemes`, which Turnover Incentive
+    clears on update. The table is rebuilt when the date rolls over so that
+    valid_from / valid_to are honoured.
+    """
+    current_date = getdate(nowdate())
+    
+    tiers = frappe.cache().get_value("active_incentive_schemes")
+    if tiers and tiers.get("date") == current_date:
+        return tiers
+    
+    schemes = frappe.get_all(
+        "Turnover Incentive",
+        filters={"is_active": 1},
+        fields=["name", "incentive_percentage", "max_incentive_amount", "min_turnover", "valid_from", "valid_to"],
+        order_by="min_turnover asc"
+    )
+    
+    schemes = [
+        frappe._dict({
+            "name": scheme.name,
+            "min_turnover": flt(scheme.min_turnover),
+            "incentive_percentage": flt(scheme.incentive_percentage),
+            "max_incentive_amount": flt(scheme.max_incentive_amount)
+        })
+        for scheme in schemes
+        if (not scheme.valid_from or getdate(scheme.valid_from) <= current_date)
+        and (not scheme.valid_to or getdate(scheme.valid_to) >= current_date)
+    ]
+    
+    tiers = {
+        "date": current_date,
+        "thresholds": [scheme.min_turnover for scheme in schemes],
+        "schemes": schemes
+    }
+    frappe.cache().set_value("active_incentive_schemes", tiers)
+    
+    return tiers
+
+
+def get_incentive_scheme(turnover):
+    """Get the highest incentive scheme whose min_turnover does not exceed the turnover"""
+    tiers = get_incentive_tiers()
+    position = bisect_right(tiers["thresholds"], flt(turnover))
+    
+    return tiers["schemes"][position - 1] if position else None
+
+
+def get_rule_set_version():
+    """Get a token identifying the current discount rule set
+    
+    The token changes whenever agreements, promotions, incentive schemes or
+    supplier defaults change, and on every new day.
+    """
+    version = frappe.cache().get_value("purchase_discount_rule_version")
+    if not version:
+        version = bump_rule_set_version()
+    
+    return f"{version}:{nowdate()}"
+
+
+def bump_rule_set_version(*args, **kwargs):
+    """Start a new discount rule-set version, invalidating memoized results"""
+    version = frappe.generate_hash(length=10)
+    frappe.cache().set_value("purchase_discount_rule_version", version)
+    return version
+
+
+def clear_discount_caches(keys):
+    """Drop cached discount rules and start a new rule-set version once the change is committed
+    
+    Clearing before the commit would let a concurrent reader cache the old
+    rules again after they were dropped.
+    """
+    def clear():
+        if keys:
+            frappe.cache().delete_value(keys)
+        bump_rule_set_version()
+    
+    frappe.db.after_commit.add(clear)
+
+
+def bump_rule_set_version_on_commit(*args, **kwargs):
+    """Hook function to start a new rule-set version once the change is committed"""
+    clear_discount_caches([])
+
+
 def apply_discounts(doc, method):
     """Hook function to apply discounts on purchase documents"""
     if doc.doctype in ["Purchase Invoice", "Purchase Estimate"]:
@@ -235,6 +507,7 @@ def convert_estimate_to_invoice(estimate_name):
             invoice_item.amount = item.amount
             invoice_item.discount_percentage = item.get("discount_percentage", 0)
             invoice_item.discount_amount = item.get("discount_amount", 0)
+            invoice_item.undiscounted_rate = item.get("undiscounted_rate", 0)
         
         # Copy discount information
         invoice_doc.apply_discount = estimate_doc.get("apply_discount", 0)
@@ -255,6 +528,86 @@ def convert_estimate_to_invoice(estimate_name):
         frappe.throw(_("Error converting estimate to invoice: {0}").format(str(e)))
 
 
+@frappe.whitelist()
+def preview_discounts(payload):
+    """Preview discounts for a compact document payload without saving anything
+    
+    payload: {"supplier", "discount_type", "items": [{"item_code", "qty", "rate", "amount", ...}]}
+    
+    Results are memoized by a hash of the payload and the current rule-set
+    version, so repeated requests for the same form state are served from cache.
+    """
+    if not frappe.has_permission("Purchase Discount Agreement", "read"):
+        frappe.throw(_("Not permitted to preview purchase discounts"), frappe.PermissionError)
+    
+    payload = frappe.parse_json(payload) or {}
+    
+    items = []
+    for row in payload.get("items") or []:
+        qty = flt(row.get("qty"))
+        rate = flt(row.get("rate"))
+        items.append({
+            "item_code": row.get("item_code"),
+            "qty": qty,
+            "rate": rate,
+            "amount": flt(row.get("amount")) if row.get("amount") is not None else qty * rate,
+            "discount_percentage": flt(row.get("discount_percentage")),
+            "undiscounted_rate": flt(row.get("undiscounted_rate"))
+        })
+    
+    preview_input = {
+        "supplier": payload.get("supplier"),
+        "discount_type": payload.get("discount_type"),
+        "items": items
+    }
+    
+    content_hash = hashlib.sha256(
+        frappe.as_json(preview_input, indent=None).encode() + get_rule_set_version().encode()
+    ).hexdigest()
+    cache_key = f"purchase_discount_preview_{content_hash}"
+    
+    preview = frappe.cache().get_value(cache_key)
+    if preview is None:
+        preview = calculate_discount_preview(preview_input)
+        frappe.cache().set_value(cache_key, preview, expires_in_sec=300)
+    
+    return preview
+
+
+def calculate_discount_preview(preview_input):
+    """Run DiscountCalculator over a detached copy of the payload"""
+    doc = frappe._dict({
+        "doctype": "Purchase Invoice",
+        "apply_discount": 1,
+        "supplier": preview_input["supplier"],
+        "discount_type": preview_input["discount_type"],
+        "items": [frappe._dict(row) for row in preview_input["items"]]
+    })
+    doc.total = sum(row.amount for row in doc["items"])
+    
+    calculator = DiscountCalculator(doc)
+    calculator.apply_all_discounts()
+    
+    return {
+        "items": [
+            {
+                "item_code": row.item_code,
+                "rate": flt(row.rate),
+                "discount_percentage": flt(row.discount_percentage),
+                "discount_amount": flt(row.discount_amount),
+                "promotion_applied": row.promotion_applied
+            }
+            for row in doc["items"]
+        ],
+        "total": flt(doc.total),
+        "discount_amount": flt(doc.discount_amount),
+        "turnover_incentive": flt(doc.turnover_incentive),
+        "total_discount_amount": flt(calculator.total_discount),
+        "effective_discount_percentage": flt(doc.effective_discount_percentage),
+        "grand_total": flt(doc.grand_total) if doc.grand_total is not None else flt(doc.total)
+    }
+
+
 @frappe.whitelist()
 def get_supplier_discounts(supplier):
     """Get all applicable discounts for a supplier"""
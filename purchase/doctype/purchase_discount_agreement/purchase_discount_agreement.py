@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate
 
+from cashiercounter.purchase.discount_calculations import clear_discount_caches
+
 
 class PurchaseDiscountAgreement(Document):
     def validate(self):
@@ -39,4 +41,15 @@ class PurchaseDiscountAgreement(Document):
     
     def on_update(self):
         """Clear cache when agreement is updated"""
-        frappe.cache().delete_value(f"supplier_discounts_{self.supplier}")
\ No newline at end of file
+        keys = [f"supplier_discounts_{self.supplier}"]
+        
+        # Agreement moved to another supplier - clear the previous supplier's map too
+        previous = self.get_doc_before_save()
+        if previous and previous.supplier != self.supplier:
+            keys.append(f"supplier_discounts_{previous.supplier}")
+        
+        clear_discount_caches(keys)
+    
+    def on_trash(self):
+        """Clear cache when agreement is deleted"""
+        clear_discount_caches([f"supplier_discounts_{self.supplier}"])
\ No newline at end of file
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate
 
+from cashiercounter.purchase.discount_calculations import clear_discount_caches
+
 
 class SeasonalPromotion(Document):
     def validate(self):
@@ -17,8 +19,8 @@ class SeasonalPromotion(Document):
     
     def on_update(self):
         """Clear cache when promotion is updated"""
-        frappe.cache().delete_value("active_promotions")
+        clear_discount_caches(["active_promotions"])
     
     def on_trash(self):
         """Clear cache when promotion is deleted"""
-        frappe.cache().delete_value("active_promotions")
\ No newline at end of file
+        clear_discount_caches(["active_promotions"])
\ No newline at end of file
@@ -0,0 +1,150 @@
+# Copyright (c) 2024, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, nowdate, now, get_first_day
+
+
+class SupplierMonthlyPurchase(Document):
+    """Per-supplier, per-month rollup of submitted Purchase Invoices for analytics"""
+    pass
+
+
+def on_doctype_update():
+    """Index the rollup for monthly totals and top-supplier lookups"""
+    frappe.db.add_index("Supplier Monthly Purchase", ["month", "total_amount"])
+
+
+def update_monthly_purchase(doc, method):
+    """Hook function to post a Purchase Invoice into the rollup on submit / cancel"""
+    if not doc.supplier or not doc.posting_date:
+        return
+    
+    sign = -1 if method == "on_cancel" else 1
+    discounted = 1 if flt(doc.get("total_discount_amount")) else 0
+    
+    post_monthly_purchase(
+        doc.supplier,
+        doc.posting_date,
+        sign * flt(doc.grand_total),
+        sign,
+        sign * flt(doc.get("total_discount_amount")),
+        sign * discounted,
+        sign * discounted * flt(doc.get("effective_discount_percentage"))
+    )
+
+
+def post_monthly_purchase(supplier, posting_date, amount, invoice_count,
+        discount, discounted_invoice_count, discount_percentage):
+    """Add an invoice's figures to the supplier's row for the month"""
+    month = get_first_day(getdate(posting_date))
+    timestamp = now()
+    
+    frappe.db.sql("""
+        INSERT INTO `tabSupplier Monthly Purchase`
+            (name, supplier, month, total_amount, invoice_count,
+            total_discount, discounted_invoice_count, discount_percentage_total,
+            creation, modified, owner, modified_by, docstatus)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 0)
+        ON DUPLICATE KEY UPDATE
+            total_amount = total_amount + VALUES(total_amount),
+            invoice_count = invoice_count + VALUES(invoice_count),
+            total_discount = total_discount + VALUES(total_discount),
+            discounted_invoice_count = discounted_invoice_count + VALUES(discounted_invoice_count),
+            discount_percentage_total = discount_percentage_total + VALUES(discount_percentage_total),
+            modified = VALUES(modified)
+    """, (
+        f"{supplier}-{month}", supplier, month, amount, invoice_count,
+        discount, discounted_invoice_count, discount_percentage,
+        timestamp, timestamp, frappe.session.user, frappe.session.user
+    ))
+
+
+def get_monthly_summary(month=None):
+    """Get invoice count, total, average and discount figures for a month across suppliers"""
+    month = get_first_day(getdate(month or nowdate()))
+    
+    result = frappe.db.sql("""
+        SELECT
+            SUM(invoice_count) as invoice_count,
+            SUM(total_amount) as total_amount,
+            SUM(total_discount) as total_discount,
+            SUM(discounted_invoice_count) as discounted_invoice_count,
+            SUM(discount_percentage_total) as discount_percentage_total
+        FROM `tabSupplier Monthly Purchase`
+        WHERE month = %s
+    """, (month,), as_dict=True)
+    
+    summary = result[0] if result else frappe._dict()
+    invoice_count = flt(summary.invoice_count)
+    discounted_invoice_count = flt(summary.discounted_invoice_count)
+    
+    return frappe._dict({
+        "invoice_count": int(invoice_count),
+        "total_amount": flt(summary.total_amount),
+        "avg_amount": flt(summary.total_amount) / invoice_count if invoice_count else 0,
+        "total_discount": flt(summary.total_discount),
+        "avg_discount_percentage": (
+            flt(summary.discount_percentage_total) / discounted_invoice_count
+            if discounted_invoice_count else 0
+        )
+    })
+
+
+def get_top_suppliers(month=None, limit=10):
+    """Get the suppliers with the highest purchase amount in a month"""
+    month = get_first_day(getdate(month or nowdate()))
+    
+    return frappe.db.sql("""
+        SELECT supplier, invoice_count, total_amount
+        FROM `tabSupplier Monthly Purchase`
+        WHERE month = %s
+        AND invoice_count > 0
+        ORDER BY total_amount DESC
+        LIMIT %s
+    """, (month, limit), as_dict=True)
+
+
+def rebuild_monthly_purchase(supplier=None):
+    """Rebuild the rollup from submitted Purchase Invoices
+    
+    Usage: bench --site [site-name] rebuild-supplier-monthly-purchase [--supplier SUPPLIER]
+    """
+    conditions = ""
+    values = {"user": frappe.session.user, "timestamp": now()}
+    
+    if supplier:
+        conditions = "AND supplier = %(supplier)s"
+        values["supplier"] = supplier
+    
+    frappe.db.sql(f"""
+        DELETE FROM `tabSupplier Monthly Purchase`
+        WHERE 1 = 1 {conditions}
+    """, values)
+    
+    frappe.db.sql(f"""
+        INSERT INTO `tabSupplier Monthly Purchase`
+            (name, supplier, month, total_amount, invoice_count,
+            total_discount, discounted_invoice_count, discount_percentage_total,
+            creation, modified, owner, modified_by, docstatus)
+        SELECT
+            CONCAT(supplier, '-', month), supplier, month,
+            SUM(grand_total), COUNT(*),
+            SUM(COALESCE(total_discount_amount, 0)),
+            SUM(COALESCE(total_discount_amount, 0) != 0),
+            SUM(IF(COALESCE(total_discount_amount, 0) != 0, COALESCE(effective_discount_percentage, 0), 0)),
+            %(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0
+        FROM (
+            SELECT *, DATE_FORMAT(posting_date, '%%Y-%%m-01') as month
+            FROM `tabPurchase Invoice`
+            WHERE docstatus = 1
+            AND supplier IS NOT NULL
+            {conditions}
+        ) invoice
+        GROUP BY supplier, month
+    """, values)
+    
+    frappe.db.commit()
+    
+    return frappe.db.count("Supplier Monthly Purchase", {"supplier": supplier} if supplier else None)
@@ -0,0 +1,128 @@
+# Copyright (c) 2024, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, nowdate, add_days, now
+
+
+class SupplierTurnoverLedger(Document):
+    """Per-supplier, per-day rollup of submitted Purchase Invoice grand totals"""
+    pass
+
+
+def on_doctype_update():
+    """Index the ledger for rolling-window lookups"""
+    frappe.db.add_index("Supplier Turnover Ledger", ["supplier", "posting_date"])
+
+
+def update_turnover_ledger(doc, method):
+    """Hook function to post a Purchase Invoice into the ledger on submit / cancel"""
+    if not doc.supplier or not doc.posting_date:
+        return
+    
+    sign = -1 if method == "on_cancel" else 1
+    post_turnover(doc.supplier, doc.posting_date, sign * flt(doc.grand_total), sign)
+
+
+def post_turnover(supplier, posting_date, turnover, invoice_count):
+    """Add turnover and invoice count to the supplier's row for the day"""
+    posting_date = getdate(posting_date)
+    timestamp = now()
+    
+    frappe.db.sql("""
+        INSERT INTO `tabSupplier Turnover Ledger`
+            (name, supplier, posting_date, turnover, invoice_count,
+            creation, modified, owner, modified_by, docstatus)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0)
+        ON DUPLICATE KEY UPDATE
+            turnover = turnover + VALUES(turnover),
+            invoice_count = invoice_count + VALUES(invoice_count),
+            modified = VALUES(modified)
+    """, (
+        f"{supplier}-{posting_date}", supplier, posting_date, turnover, invoice_count,
+        timestamp, timestamp, frappe.session.user, frappe.session.user
+    ))
+
+
+def get_supplier_turnover(supplier, from_date, to_date):
+    """Get a supplier's turnover between two dates (inclusive) from the ledger"""
+    result = frappe.db.sql("""
+        SELECT SUM(turnover) as total
+        FROM `tabSupplier Turnover Ledger`
+        WHERE supplier = %s
+        AND posting_date BETWEEN %s AND %s
+    """, (supplier, from_date, to_date), as_dict=True)
+    
+    return flt(result[0].total) if result and result[0].total else 0
+
+
+def get_yearly_turnover(supplier):
+    """Get a supplier's turnover over the last 365 days"""
+    return get_supplier_turnover(supplier, add_days(nowdate(), -365), nowdate())
+
+
+def get_turnover_by_supplier(from_date, to_date, from_supplier=None, to_supplier=None):
+    """Get turnover between two dates for every enabled supplier with purchases, in one query
+    
+    from_supplier / to_supplier optionally restrict suppliers to the name range
+    [from_supplier, to_supplier).
+    """
+    conditions = ""
+    values = {"from_date": from_date, "to_date": to_date}
+    
+    if from_supplier:
+        conditions += " AND ledger.supplier >= %(from_supplier)s"
+        values["from_supplier"] = from_supplier
+    
+    if to_supplier:
+        conditions += " AND ledger.supplier < %(to_supplier)s"
+        values["to_supplier"] = to_supplier
+    
+    return frappe.db.sql(f"""
+        SELECT ledger.supplier, SUM(ledger.turnover) as total_purchase
+        FROM `tabSupplier Turnover Ledger` ledger
+        INNER JOIN `tabSupplier` supplier ON supplier.name = ledger.supplier
+        WHERE supplier.disabled = 0
+        AND ledger.posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {conditions}
+        GROUP BY ledger.supplier
+        HAVING total_purchase > 0
+    """, values, as_dict=True)
+
+
+def rebuild_turnover_ledger(supplier=None):
+    """Rebuild the ledger from submitted Purchase Invoices
+    
+    Usage: bench --site [site-name] rebuild-supplier-turnover-ledger [--supplier SUPPLIER]
+    """
+    conditions = ""
+    values = {"user": frappe.session.user, "timestamp": now()}
+    
+    if supplier:
+        conditions = "AND supplier = %(supplier)s"
+        values["supplier"] = supplier
+    
+    frappe.db.sql(f"""
+        DELETE FROM `tabSupplier Turnover Ledger`
+        WHERE 1 = 1 {conditions}
+    """, values)
+    
+    frappe.db.sql(f"""
+        INSERT INTO `tabSupplier Turnover Ledger`
+            (name, supplier, posting_date, turnover, invoice_count,
+            creation, modified, owner, modified_by, docstatus)
+        SELECT
+            CONCAT(supplier, '-', posting_date), supplier, posting_date,
+            SUM(grand_total), COUNT(*),
+            %(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0
+        FROM `tabPurchase Invoice`
+        WHERE docstatus = 1
+        AND supplier IS NOT NULL
+        {conditions}
+        GROUP BY supplier, posting_date
+    """, values)
+    
+    frappe.db.commit()
+    
+    return frappe.db.count("Supplier Turnover Ledger", {"supplier": supplier} if supplier else None)
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate
 
+from cashiercounter.purchase.discount_calculations import clear_discount_caches
+
 
 class TurnoverIncentive(Document):
     def validate(self):
@@ -27,4 +29,8 @@ class TurnoverIncentive(Document):
     
     def on_update(self):
         """Clear cache when incentive scheme is updated"""
-        frappe.cache().delete_value("active_incentive_schemes")
\ No newline at end of file
+        clear_discount_caches(["active_incentive_schemes"])
+    
+    def on_trash(self):
+        """Clear cache when incentive scheme is deleted"""
+        clear_discount_caches(["active_incentive_schemes"])
\ No newline at end of file
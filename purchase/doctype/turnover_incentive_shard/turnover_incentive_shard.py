@@ -0,0 +1,9 @@
+# Copyright (c) 2024, Your Company and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class TurnoverIncentiveShard(Document):
+    """Checkpoint for one supplier range of a weekly turnover incentive run"""
+    pass
@@ -0,0 +1,133 @@
+"""
+ERPNext v15 Purchase Customizations - Discount Pipeline Instrumentation
+Records duration and database query count for each DiscountCalculator stage.
+
+Enable with `purchase_discount_instrumentation: 1` in site_config.json. Each
+calculation is logged as a structured line to the `cashiercounter.discounts`
+logger and pushed to a rolling Redis sample list from which
+get_discount_stage_stats computes p50 / p95 / p99 per stage.
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+
+SAMPLES_KEY = "purchase_discount_stage_samples"
+MAX_SAMPLES = 1000
+
+
+class DiscountInstrumentation:
+    """Context manager that times DiscountCalculator stages and counts queries"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.enabled = cint(frappe.conf.get("purchase_discount_instrumentation"))
+        self.stages = {}
+        self.query_count = 0
+        self.original_sql = None
+
+    def __enter__(self):
+        if self.enabled:
+            # Count every query issued through frappe.db while the calculation runs
+            self.original_sql = frappe.db.sql
+
+            def counting_sql(*args, **kwargs):
+                self.query_count += 1
+                return self.original_sql(*args, **kwargs)
+
+            frappe.db.sql = counting_sql
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.enabled:
+            return False
+
+        frappe.db.sql = self.original_sql
+
+        if exc_type is None and self.stages:
+            self.record()
+
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage and count the queries it issues"""
+        if not self.enabled:
+            yield
+            return
+
+        queries_before = self.query_count
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = {
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "queries": self.query_count - queries_before
+            }
+
+    def record(self):
+        """Emit the measurements as a log line and a rolling Redis sample"""
+        sample = {
+            "doctype": self.doc.get("doctype"),
+            "name": self.doc.get("name"),
+            "rows": len(self.doc.get("items") or []),
+            "stages": self.stages
+        }
+
+        try:
+            frappe.logger("cashiercounter.discounts").info(json.dumps(sample))
+
+            frappe.cache().lpush(SAMPLES_KEY, json.dumps(self.stages))
+            frappe.cache().ltrim(SAMPLES_KEY, 0, MAX_SAMPLES - 1)
+        except Exception as e:
+            frappe.log_error(f"Error recording discount stage timings: {str(e)}")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0
+
+    rank = max(int(math.ceil(pct / 100 * len(values))) - 1, 0)
+    return values[rank]
+
+
+@frappe.whitelist()
+def get_discount_stage_stats():
+    """Get p50 / p95 / p99 duration and query count per stage over the rolling sample"""
+    frappe.only_for(["System Manager", "Purchase Manager"])
+
+    durations = {}
+    queries = {}
+
+    for raw in frappe.cache().lrange(SAMPLES_KEY, 0, MAX_SAMPLES - 1) or []:
+        for stage, measurement in json.loads(raw).items():
+            durations.setdefault(stage, []).append(flt(measurement.get("duration_ms")))
+            queries.setdefault(stage, []).append(cint(measurement.get("queries")))
+
+    stats = {}
+    for stage, values in durations.items():
+        values.sort()
+        stage_queries = sorted(queries[stage])
+        stats[stage] = {
+            "samples": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "p50_queries": percentile(stage_queries, 50),
+            "p95_queries": percentile(stage_queries, 95),
+            "p99_queries": percentile(stage_queries, 99)
+        }
+
+    if not stats and not cint(frappe.conf.get("purchase_discount_instrumentation")):
+        frappe.msgprint(_("Discount instrumentation is disabled. Set purchase_discount_instrumentation in site config to enable it."))
+
+    return stats
@@ -94,7 +94,18 @@ function load_analytics(page) {
         </div>
         
         <div class="row mt-4">
-            <div class="col-sm-12">
+            <div class="col-sm-6">
+                <div class="card">
+                    <div class="card-header">
+                        <h5>Recent Purchase Invoices</h5>
+                    </div>
+                    <div class="card-body">
+                        <div id="recent-invoices">Loading...</div>
+                    </div>
+                </div>
+            </div>
+            
+            <div class="col-sm-6">
                 <div class="card">
                     <div class="card-header">
                         <h5>Recent Purchase Estimates</h5>
@@ -114,18 +125,18 @@ function load_analytics(page) {
 }
 
 function load_dashboard_data() {
-    // Load purchase analytics
+    // Whole page payload in one GET, revalidated by the browser with its ETag
     frappe.call({
-        method: 'cashiercounter.purchase.tasks.get_purchase_analytics',
+        method: 'cashiercounter.purchase.page.purchase_analytics.purchase_analytics.get_dashboard_bootstrap',
+        type: 'GET',
         callback: function(r) {
             if (r.message) {
                 update_dashboard_metrics(r.message);
+                render_documents('#recent-invoices', 'purchase-invoice', 'Invoice', r.message.recent_invoices || []);
+                render_documents('#recent-estimates', 'purchase-estimate', 'Estimate', r.message.recent_estimates || []);
             }
         }
     });
-
-    // Load recent estimates
-    load_recent_estimates();
 }
 
 function update_dashboard_metrics(data) {
@@ -134,38 +145,15 @@ function update_dashboard_metrics(data) {
     $('#monthly-purchase').text(format_currency(monthly_data.total_amount || 0));
 
     // Update active promotions count
-    $('#active-promotions').text(data.active_promotions || 0);
+    let promotions = data.active_promotions || [];
+    $('#active-promotions').text(promotions.length);
+    $('#discount-distribution').html(promotions.length
+        ? promotions.map(promotion => `<div>${promotion.promotion_name}: ${promotion.discount_percentage}%</div>`).join('')
+        : __('No active promotions'));
 
-    // Calculate and display discount metrics
-    frappe.call({
-        method: 'frappe.client.get_list',
-        args: {
-            doctype: 'Purchase Invoice',
-            filters: {
-                posting_date: ['>=', frappe.datetime.month_start()],
-                docstatus: 1
-            },
-            fields: ['total_discount_amount', 'effective_discount_percentage', 'total']
-        },
-        callback: function(r) {
-            if (r.message) {
-                let total_discount = 0;
-                let total_percentage = 0;
-                let count = 0;
-
-                r.message.forEach(function(invoice) {
-                    if (invoice.total_discount_amount) {
-                        total_discount += invoice.total_discount_amount;
-                        total_percentage += invoice.effective_discount_percentage || 0;
-                        count++;
-                    }
-                });
-
-                $('#total-discounts').text(format_currency(total_discount));
-                $('#avg-discount').text((count > 0 ? (total_percentage / count).toFixed(2) : 0) + '%');
-            }
-        }
-    });
+    // Display discount metrics
+    $('#total-discounts').text(format_currency(monthly_data.total_discount || 0));
+    $('#avg-discount').text(flt(monthly_data.avg_discount_percentage || 0, 2).toFixed(2) + '%');
 
     // Update top suppliers
     if (data.top_suppliers) {
@@ -185,36 +173,22 @@ function update_dashboard_metrics(data) {
     }
 }
 
-function load_recent_estimates() {
-    frappe.call({
-        method: 'frappe.client.get_list',
-        args: {
-            doctype: 'Purchase Estimate',
-            fields: ['name', 'supplier', 'posting_date', 'grand_total', 'status'],
-            order_by: 'creation desc',
-            limit_start: 0,
-            limit_page_length: 10
-        },
-        callback: function(r) {
-            if (r.message) {
-                let estimates_html = '<table class="table table-sm">';
-                estimates_html += '<thead><tr><th>Estimate</th><th>Supplier</th><th>Date</th><th>Amount</th><th>Status</th></tr></thead><tbody>';
-                
-                r.message.forEach(function(estimate) {
-                    estimates_html += `<tr>
-                        <td><a href="/app/purchase-estimate/${estimate.name}">${estimate.name}</a></td>
-                        <td>${estimate.supplier}</td>
-                        <td>${frappe.datetime.str_to_user(estimate.posting_date)}</td>
-                        <td>${format_currency(estimate.grand_total)}</td>
-                        <td><span class="badge badge-${get_status_color(estimate.status)}">${estimate.status}</span></td>
-                    </tr>`;
-                });
-                
-                estimates_html += '</tbody></table>';
-                $('#recent-estimates').html(estimates_html);
-            }
-        }
+function render_documents(target, route, label, documents) {
+    let documents_html = '<table class="table table-sm">';
+    documents_html += `<thead><tr><th>${label}</th><th>Supplier</th><th>Date</th><th>Amount</th><th>Status</th></tr></thead><tbody>`;
+    
+    documents.forEach(function(doc) {
+        documents_html += `<tr>
+            <td><a href="/app/${route}/${doc.name}">${doc.name}</a></td>
+            <td>${doc.supplier}</td>
+            <td>${frappe.datetime.str_to_user(doc.posting_date)}</td>
+            <td>${format_currency(doc.grand_total)}</td>
+            <td><span class="badge badge-${get_status_color(doc.status)}">${doc.status}</span></td>
+        </tr>`;
     });
+    
+    documents_html += '</tbody></table>';
+    $(target).html(documents_html);
 }
 
 function get_status_color(status) {
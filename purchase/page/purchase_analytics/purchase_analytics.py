@@ -1,36 +1,90 @@
 # Copyright (c) 2024, Your Company and contributors
 # For license information, please see license.txt
 
+import hashlib
+
 import frappe
+from frappe.utils import cint
+
+from cashiercounter.purchase.discount_calculations import get_active_promotion_index
+from cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase import (
+    get_monthly_summary,
+    get_top_suppliers,
+)
 
 
 @frappe.whitelist()
 def get_analytics_data():
-    """Get analytics data for purchase dashboard"""
+    """Get analytics data for purchase dashboard
+    
+    Reads the Supplier Monthly Purchase rollup, so the cost does not grow
+    with invoice history.
+    """
+    return {
+        "monthly_purchase": get_monthly_summary(),
+        "active_promotions": len(get_active_promotion_index()["promotions"]),
+        "top_suppliers": get_top_suppliers(limit=3)
+    }
+
+
+BOOTSTRAP_CACHE_TTL = 60
+
+
+@frappe.whitelist(methods=["GET"])
+def get_dashboard_bootstrap():
+    """Get the whole Purchase Analytics page payload in one request
+    
+    The payload is cached per user for `purchase_analytics_cache_ttl` seconds
+    (site config, default 60), since the recent document lists honour the
+    user's User Permissions. It carries an ETag, so a browser revalidating
+    with If-None-Match gets a 304 without any database query.
+    """
+    frappe.only_for(["Purchase Manager", "Purchase User", "System Manager"])
+    
+    cache_key = f"purchase_analytics_bootstrap_{frappe.session.user}"
+    
+    bootstrap = frappe.cache().get_value(cache_key)
+    if not bootstrap:
+        payload = build_dashboard_payload()
+        bootstrap = {
+            "etag": hashlib.sha1(frappe.as_json(payload).encode()).hexdigest(),
+            "payload": payload
+        }
+        frappe.cache().set_value(
+            cache_key,
+            bootstrap,
+            expires_in_sec=cint(frappe.conf.get("purchase_analytics_cache_ttl")) or BOOTSTRAP_CACHE_TTL
+        )
     
-    # This would typically fetch data from the database
-    # For now, returning sample data structure
-    # Fetch monthly purchase data
-    monthly_purchase = frappe.db.sql("""
-        SELECT SUM(total_amount) AS total_amount, COUNT(name) AS invoice_count, AVG(total_amount) AS avg_amount
-        FROM `tabPurchase Invoice`
-        WHERE MONTH(posting_date) = MONTH(CURDATE()) AND YEAR(posting_date) = YEAR(CURDATE())
-    """, as_dict=True)[0]
-
-    # Fetch active promotions count
-    active_promotions = frappe.db.count("Promotion", filters={"status": "Active"})
-
-    # Fetch top suppliers
-    top_suppliers = frappe.db.sql("""
-        SELECT supplier, SUM(total_amount) AS total_amount, COUNT(name) AS invoice_count
-        FROM `tabPurchase Invoice`
-        GROUP BY supplier
-        ORDER BY total_amount DESC
-        LIMIT 3
-    """, as_dict=True)
+    etag = f'"{bootstrap["etag"]}"'
+    response_headers = getattr(frappe.local, "response_headers", None)
+    if response_headers is not None:
+        response_headers["ETag"] = etag
+        response_headers["Cache-Control"] = "private, no-cache"
+    
+    if frappe.get_request_header("If-None-Match") == etag:
+        frappe.local.response["http_status_code"] = 304
+        return
+    
+    return bootstrap["payload"]
+
 
+def build_dashboard_payload():
+    """Build KPIs, top suppliers, recent documents and active promotions for the page"""
     return {
-        "monthly_purchase": monthly_purchase,
-        "active_promotions": active_promotions,
-        "top_suppliers": top_suppliers
-    }
\ No newline at end of file
+        "monthly_purchase": get_monthly_summary(),
+        "top_suppliers": get_top_suppliers(limit=5),
+        "active_promotions": get_active_promotion_index()["promotions"],
+        "recent_invoices": frappe.get_list(
+            "Purchase Invoice",
+            fields=["name", "supplier", "posting_date", "grand_total", "status"],
+            order_by="creation desc",
+            limit_page_length=10
+        ),
+        "recent_estimates": frappe.get_list(
+            "Purchase Estimate",
+            fields=["name", "supplier", "posting_date", "grand_total", "status"],
+            order_by="creation desc",
+            limit_page_length=10
+        )
+    }
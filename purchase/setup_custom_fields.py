@@ -94,6 +94,23 @@ def execute():
                 "fieldtype": "Data",
                 "read_only": 1,
                 "insert_after": "discount_amount"
+            },
+            {
+                "fieldname": "undiscounted_rate",
+                "label": "Rate Before Discount",
+                "fieldtype": "Currency",
+                "read_only": 1,
+                "hidden": 1,
+                "insert_after": "promotion_applied"
+            },
+            {
+                "fieldname": "discount_fingerprint",
+                "label": "Discount Fingerprint",
+                "fieldtype": "Data",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+                "insert_after": "undiscounted_rate"
             }
         ]
     }
@@ -5,12 +5,41 @@ Handles automated reminders, status updates, and incentive calculations
 
 import frappe
 from frappe import _
-from frappe.utils import nowdate, add_days, today
+from frappe.model.naming import set_new_name
+from frappe.utils import cint, flt, nowdate, now, add_days, today
 from datetime import datetime
+import time
+
+from cashiercounter.purchase.discount_calculations import (
+    build_promotion_index,
+    bump_rule_set_version,
+    get_active_promotion_index,
+    get_incentive_scheme,
+)
+from cashiercounter.purchase.doctype.supplier_monthly_purchase.supplier_monthly_purchase import (
+    get_monthly_summary,
+    get_top_suppliers,
+)
+from cashiercounter.purchase.doctype.supplier_turnover_ledger.supplier_turnover_ledger import (
+    get_turnover_by_supplier,
+    get_yearly_turnover,
+)
+
+
+INCENTIVE_CHUNK_SIZE = 500
+INCENTIVE_SHARD_SIZE = 250
+MAX_SHARD_ATTEMPTS = 3
+UNFINISHED_SHARD_STATUSES = ["Queued", "Running", "Failed"]
+CLEANUP_BATCH_SIZE = 1000
+CLEANUP_BATCH_SLEEP = 0.1
 
 
 def send_credit_note_reminders():
-    """Send reminders for pending credit notes"""
+    """Send reminders for pending credit notes
+    
+    Recipients are resolved once per run and each supplier gets one digest of
+    all its pending notes, queued through the email queue.
+    """
     try:
         # Get pending credit notes due for reminder
         pending_notes = frappe.get_all(
@@ -19,67 +48,77 @@ def send_credit_note_reminders():
                 "status": "Pending",
                 "reminder_date": ["<=", today()]
             },
-            fields=["name", "supplier", "credit_note_amount", "expected_settlement_date"]
+            fields=["name", "supplier", "credit_note_amount", "expected_settlement_date"],
+            order_by="supplier asc, expected_settlement_date asc"
         )
         
+        if not pending_notes:
+            return
+        
+        recipients = get_purchase_team_recipients()
+        if not recipients:
+            return
+        
+        notes_by_supplier = {}
         for note in pending_notes:
-            # Send email reminder to purchase team
-            send_credit_note_reminder_email(note)
-            
-            # Update next reminder date
-            next_reminder = add_days(today(), 3)  # Remind again in 3 days
-            frappe.db.set_value(
-                "Supplier Credit Note Tracking", 
-                note.name, 
-                "reminder_date", 
-                next_reminder
-            )
+            notes_by_supplier.setdefault(note.supplier, []).append(note)
+        
+        # Send one email reminder per supplier to purchase team
+        for supplier, notes in notes_by_supplier.items():
+            send_credit_note_digest_email(supplier, notes, recipients)
         
-        if pending_notes:
-            frappe.logger().info(f"Sent {len(pending_notes)} credit note reminders")
+        # Remind again in 3 days
+        frappe.db.sql("""
+            UPDATE `tabSupplier Credit Note Tracking`
+            SET reminder_date = %(next_reminder)s
+            WHERE name IN %(names)s
+        """, {"next_reminder": add_days(today(), 3), "names": [note.name for note in pending_notes]})
+        
+        frappe.logger().info(
+            f"Sent {len(pending_notes)} credit note reminders in {len(notes_by_supplier)} supplier digests"
+        )
             
     except Exception as e:
         frappe.log_error(f"Error in send_credit_note_reminders: {str(e)}")
 
 
 def update_promotion_status():
-    """Update status of seasonal promotions based on dates"""
+    """Update status of seasonal promotions based on dates
+    
+    Activation and deactivation are one UPDATE each, however many promotions
+    change, and the active promotion index is rebuilt so the first invoice of
+    the day finds it warm.
+    """
     try:
         current_date = nowdate()
         
         # Activate promotions that should start today
-        starting_promotions = frappe.get_all(
-            "Seasonal Promotion",
-            filters={
-                "start_date": current_date,
-                "is_active": 0
-            },
-            fields=["name"]
-        )
-        
-        for promo in starting_promotions:
-            frappe.db.set_value("Seasonal Promotion", promo.name, "is_active", 1)
+        frappe.db.sql("""
+            UPDATE `tabSeasonal Promotion`
+            SET is_active = 1, modified = %(modified)s
+            WHERE start_date = %(current_date)s
+            AND is_active = 0
+        """, {"current_date": current_date, "modified": now()})
+        activated = frappe.db._cursor.rowcount
         
         # Deactivate expired promotions
-        expired_promotions = frappe.get_all(
-            "Seasonal Promotion",
-            filters={
-                "end_date": ["<", current_date],
-                "is_active": 1
-            },
-            fields=["name"]
-        )
+        frappe.db.sql("""
+            UPDATE `tabSeasonal Promotion`
+            SET is_active = 0, modified = %(modified)s
+            WHERE end_date < %(current_date)s
+            AND is_active = 1
+        """, {"current_date": current_date, "modified": now()})
+        deactivated = frappe.db._cursor.rowcount
         
-        for promo in expired_promotions:
-            frappe.db.set_value("Seasonal Promotion", promo.name, "is_active", 0)
+        frappe.db.commit()
         
-        # Clear promotion cache
-        frappe.cache().delete_value("active_promotions")
+        # Pre-warm the promotion cache for the new day
+        bump_rule_set_version()
+        frappe.cache().set_value("active_promotions", build_promotion_index(current_date))
         
-        if starting_promotions or expired_promotions:
+        if activated or deactivated:
             frappe.logger().info(
-                f"Updated promotion status: {len(starting_promotions)} activated, "
-                f"{len(expired_promotions)} deactivated"
+                f"Updated promotion status: {activated} activated, {deactivated} deactivated"
             )
             
     except Exception as e:
@@ -87,61 +126,268 @@ def update_promotion_status():
 
 
 def calculate_turnover_incentives():
-    """Calculate and update turnover incentives for suppliers"""
+    """Calculate and update turnover incentives for suppliers
+    
+    Suppliers are split into shards processed in parallel on the long queue.
+    Today's run is resumed instead of started over, and unfinished shards of
+    earlier runs are retried until they reach MAX_SHARD_ATTEMPTS.
+    """
     try:
-        # Get all active suppliers
-        suppliers = frappe.get_all("Supplier", filters={"disabled": 0}, fields=["name"])
+        return start_incentive_run()
         
-        for supplier in suppliers:
-            calculate_supplier_incentive(supplier.name)
+    except Exception as e:
+        frappe.log_error(f"Error in calculate_turnover_incentives: {str(e)}")
+
+
+def start_incentive_run():
+    """Start or resume today's incentive run, retry unfinished shards of earlier runs, and enqueue them"""
+    run_id = f"TI-{nowdate()}"
+    
+    # Resume today's run if it is unfinished, else start it (again)
+    if not frappe.db.exists("Turnover Incentive Shard", {"run_id": run_id, "status": ["in", UNFINISHED_SHARD_STATUSES]}):
+        create_incentive_shards(run_id)
+    
+    shards = frappe.get_all(
+        "Turnover Incentive Shard",
+        filters={"status": ["in", UNFINISHED_SHARD_STATUSES]},
+        fields=["name", "attempts"]
+    )
+    
+    queued = 0
+    for shard in shards:
+        if cint(shard.attempts) >= MAX_SHARD_ATTEMPTS:
+            frappe.db.set_value("Turnover Incentive Shard", shard.name, "status", "Abandoned")
+            continue
+        
+        frappe.enqueue(
+            "cashiercounter.purchase.tasks.process_incentive_shard",
+            queue="long",
+            job_id=f"turnover_incentive_{shard.name}",
+            deduplicate=True,
+            enqueue_after_commit=True,
+            shard=shard.name
+        )
+        queued += 1
+    
+    frappe.db.commit()
+    frappe.logger().info(f"Queued {queued} turnover incentive shards, run {run_id}")
+    
+    return get_incentive_run_progress(run_id)
+
+
+def create_incentive_shards(run_id):
+    """Split enabled suppliers into contiguous name ranges and create a checkpoint per range"""
+    calculation_date = nowdate()
+    
+    # A completed run for the same day is recalculated from scratch
+    frappe.db.delete("Turnover Incentive Shard", {"run_id": run_id})
+    
+    suppliers = frappe.get_all("Supplier", filters={"disabled": 0}, pluck="name", order_by="name asc")
+    boundaries = [""] + suppliers[INCENTIVE_SHARD_SIZE::INCENTIVE_SHARD_SIZE]
+    
+    for shard_index, from_supplier in enumerate(boundaries):
+        frappe.get_doc({
+            "doctype": "Turnover Incentive Shard",
+            "run_id": run_id,
+            "calculation_date": calculation_date,
+            "shard_index": shard_index,
+            "status": "Queued",
+            "from_supplier": from_supplier,
+            "to_supplier": boundaries[shard_index + 1] if shard_index + 1 < len(boundaries) else ""
+        }).insert(ignore_permissions=True)
+    
+    frappe.db.commit()
+    
+    return run_id
+
+
+def process_incentive_shard(shard):
+    """Calculate incentives for one shard of suppliers and checkpoint the result"""
+    shard_doc = frappe.get_doc("Turnover Incentive Shard", shard)
+    if shard_doc.status not in UNFINISHED_SHARD_STATUSES:
+        return
+    
+    attempts = cint(shard_doc.attempts) + 1
+    frappe.db.set_value("Turnover Incentive Shard", shard, {"status": "Running", "attempts": attempts})
+    frappe.db.commit()
+    
+    try:
+        suppliers_processed, incentives_saved = calculate_incentives(
+            shard_doc.calculation_date, shard_doc.from_supplier, shard_doc.to_supplier
+        )
         
-        frappe.logger().info(f"Calculated turnover incentives for {len(suppliers)} suppliers")
+        frappe.db.set_value("Turnover Incentive Shard", shard, {
+            "status": "Completed",
+            "suppliers_processed": suppliers_processed,
+            "incentives_saved": incentives_saved,
+            "error": None
+        })
+        frappe.db.commit()
         
     except Exception as e:
-        frappe.log_error(f"Error in calculate_turnover_incentives: {str(e)}")
+        frappe.db.rollback()
+        frappe.db.set_value("Turnover Incentive Shard", shard, {
+            "status": "Abandoned" if attempts >= MAX_SHARD_ATTEMPTS else "Failed",
+            "error": str(e)
+        })
+        frappe.db.commit()
+        frappe.log_error(f"Error in turnover incentive shard {shard}: {str(e)}")
+    
+    frappe.publish_realtime(
+        "turnover_incentive_progress",
+        get_incentive_run_progress(shard_doc.run_id),
+        user=shard_doc.owner
+    )
+
+
+def calculate_incentives(calculation_date, from_supplier=None, to_supplier=None):
+    """Calculate incentives for suppliers in [from_supplier, to_supplier) and return (processed, saved)"""
+    start = time.monotonic()
+    
+    # Get yearly turnover of the suppliers in one grouped query
+    turnovers = get_turnover_by_supplier(
+        add_days(calculation_date, -365), calculation_date, from_supplier, to_supplier
+    )
+    
+    incentives = []
+    for row in turnovers:
+        scheme = get_incentive_scheme(row.total_purchase)
+        if scheme:
+            incentives.append(
+                (row.supplier, flt(row.total_purchase), get_incentive_amount(row.total_purchase, scheme), scheme.name)
+            )
+    
+    # Write records in chunks, committing after each one
+    for chunk_start in range(0, len(incentives), INCENTIVE_CHUNK_SIZE):
+        save_supplier_incentive_records(incentives[chunk_start:chunk_start + INCENTIVE_CHUNK_SIZE], calculation_date)
+        frappe.db.commit()
+    
+    elapsed = time.monotonic() - start
+    frappe.logger().info(
+        f"Calculated turnover incentives for {len(incentives)} of {len(turnovers)} suppliers "
+        f"in {elapsed:.2f}s ({len(turnovers) / elapsed if elapsed else 0:.0f} suppliers/s)"
+    )
+    
+    return len(turnovers), len(incentives)
+
+
+@frappe.whitelist()
+def get_incentive_run_progress(run_id):
+    """Get shard counts by status for an incentive run"""
+    shards = frappe.get_all(
+        "Turnover Incentive Shard",
+        filters={"run_id": run_id},
+        fields=["status", "suppliers_processed", "incentives_saved"]
+    )
+    
+    progress = {
+        "run_id": run_id,
+        "total": len(shards),
+        "suppliers_processed": sum(shard.suppliers_processed or 0 for shard in shards),
+        "incentives_saved": sum(shard.incentives_saved or 0 for shard in shards)
+    }
+    for status in ("Queued", "Running", "Completed", "Failed", "Abandoned"):
+        progress[status.lower()] = sum(1 for shard in shards if shard.status == status)
+    
+    return progress
+
+
+def get_incentive_amount(turnover, scheme):
+    """Get the incentive for a turnover under a scheme, capped at its maximum"""
+    incentive_amount = flt(turnover) * scheme.incentive_percentage / 100
+    
+    # Apply maximum cap if specified
+    if scheme.max_incentive_amount > 0:
+        incentive_amount = min(incentive_amount, scheme.max_incentive_amount)
+    
+    return incentive_amount
+
+
+def save_supplier_incentive_records(incentives, calculation_date=None):
+    """Bulk create or update incentive records for (supplier, turnover, amount, scheme) rows"""
+    calculation_date = calculation_date or nowdate()
+    
+    existing_records = {
+        record.supplier: record.name
+        for record in frappe.get_all(
+            "Supplier Turnover Incentive",
+            filters={
+                "calculation_date": calculation_date,
+                "supplier": ["in", [incentive[0] for incentive in incentives]]
+            },
+            fields=["name", "supplier"]
+        )
+    }
+    
+    updates = {}
+    inserts = []
+    timestamp = now()
+    
+    for supplier, turnover, incentive_amount, scheme in incentives:
+        if supplier in existing_records:
+            updates[existing_records[supplier]] = {
+                "yearly_turnover": turnover,
+                "incentive_amount": incentive_amount,
+                "incentive_scheme": scheme
+            }
+        else:
+            # bulk_insert skips defaults and naming, so take both from a new document
+            doc = frappe.new_doc("Supplier Turnover Incentive")
+            doc.update({
+                "supplier": supplier,
+                "calculation_date": calculation_date,
+                "yearly_turnover": turnover,
+                "incentive_amount": incentive_amount,
+                "incentive_scheme": scheme
+            })
+            set_new_name(doc)
+            
+            inserts.append((
+                doc.name, supplier, calculation_date, turnover, incentive_amount, scheme,
+                doc.status or get_default_incentive_status(),
+                timestamp, timestamp, frappe.session.user, frappe.session.user, 0
+            ))
+    
+    if updates:
+        frappe.db.bulk_update("Supplier Turnover Incentive", updates)
+    
+    if inserts:
+        frappe.db.bulk_insert(
+            "Supplier Turnover Incentive",
+            fields=[
+                "name", "supplier", "calculation_date", "yearly_turnover", "incentive_amount", "incentive_scheme",
+                "status", "creation", "modified", "owner", "modified_by", "docstatus"
+            ],
+            values=inserts
+        )
+
+
+def get_default_incentive_status():
+    """Get the status a new Supplier Turnover Incentive starts in: the field default, else its first option"""
+    field = frappe.get_meta("Supplier Turnover Incentive").get_field("status")
+    if not field:
+        return None
+    
+    options = [option for option in (field.options or "").split("\n") if option]
+    return field.default or (options[0] if options else None)
 
 
 def calculate_supplier_incentive(supplier_name):
     """Calculate incentive for a specific supplier"""
     try:
         # Get yearly purchase amount
-        from_date = add_days(nowdate(), -365)
-        to_date = nowdate()
-        
-        result = frappe.db.sql("""
-            SELECT SUM(grand_total) as total_purchase
-            FROM `tabPurchase Invoice`
-            WHERE supplier = %s
-            AND posting_date BETWEEN %s AND %s
-            AND docstatus = 1
-        """, (supplier_name, from_date, to_date), as_dict=True)
-        
-        total_purchase = result[0].total_purchase if result and result[0].total_purchase else 0
+        total_purchase = get_yearly_turnover(supplier_name)
         
         if total_purchase <= 0:
             return
         
         # Get applicable incentive scheme
-        incentive_schemes = frappe.get_all(
-            "Turnover Incentive",
-            filters={
-                "is_active": 1,
-                "min_turnover": ["<=", total_purchase]
-            },
-            fields=["name", "incentive_percentage", "max_incentive_amount", "min_turnover"],
-            order_by="min_turnover desc",
-            limit=1
-        )
+        scheme = get_incentive_scheme(total_purchase)
         
-        if not incentive_schemes:
+        if not scheme:
             return
         
-        scheme = incentive_schemes[0]
-        incentive_amount = total_purchase * scheme.incentive_percentage / 100
-        
-        # Apply maximum cap if specified
-        if scheme.max_incentive_amount > 0:
-            incentive_amount = min(incentive_amount, scheme.max_incentive_amount)
+        incentive_amount = get_incentive_amount(total_purchase, scheme)
         
         # Create or update supplier incentive record
         create_supplier_incentive_record(supplier_name, total_purchase, incentive_amount, scheme.name)
@@ -184,51 +430,49 @@ def create_supplier_incentive_record(supplier, turnover, incentive_amount, schem
         frappe.log_error(f"Error creating incentive record for {supplier}: {str(e)}")
 
 
-def send_credit_note_reminder_email(credit_note):
-    """Send email reminder for pending credit note"""
+def get_purchase_team_recipients():
+    """Get email addresses of enabled Purchase Managers"""
+    purchase_users = frappe.get_all(
+        "User",
+        filters={
+            "enabled": 1,
+            "name": ["in", get_users_with_role("Purchase Manager") or [""]]
+        },
+        fields=["email"]
+    )
+    
+    return [user.email for user in purchase_users if user.email]
+
+
+def send_credit_note_digest_email(supplier, credit_notes, recipients):
+    """Queue one reminder email listing all pending credit notes of a supplier"""
     try:
-        # Get purchase team email addresses
-        purchase_users = frappe.get_all(
-            "User",
-            filters={
-                "enabled": 1,
-                "name": ["in", get_users_with_role("Purchase Manager")]
-            },
-            fields=["email", "full_name"]
-        )
-        
-        if not purchase_users:
-            return
-        
-        recipients = [user.email for user in purchase_users if user.email]
+        subject = f"Credit Note Reminder - {supplier}"
         
-        if not recipients:
-            return
+        rows = "".join(f"""
+            <tr>
+                <td>{credit_note.name}</td>
+                <td>{frappe.format(credit_note.credit_note_amount, {"fieldtype": "Currency"})}</td>
+                <td>{credit_note.expected_settlement_date}</td>
+            </tr>""" for credit_note in credit_notes)
         
-        # Prepare email content
-        subject = f"Credit Note Reminder - {credit_note.supplier}"
+        total = sum(flt(credit_note.credit_note_amount) for credit_note in credit_notes)
         
         message = f"""
         <p>Dear Purchase Team,</p>
         
-        <p>This is a reminder for a pending credit note:</p>
+        <p>This is a reminder for {len(credit_notes)} pending credit note(s) from <strong>{supplier}</strong>:</p>
         
         <table border="1" style="border-collapse: collapse; width: 100%;">
             <tr>
                 <td><strong>Credit Note</strong></td>
-                <td>{credit_note.name}</td>
-            </tr>
-            <tr>
-                <td><strong>Supplier</strong></td>
-                <td>{credit_note.supplier}</td>
-            </tr>
-            <tr>
                 <td><strong>Amount</strong></td>
-                <td>{frappe.format(credit_note.credit_note_amount, {"fieldtype": "Currency"})}</td>
-            </tr>
-            <tr>
                 <td><strong>Expected Settlement</strong></td>
-                <td>{credit_note.expected_settlement_date}</td>
+            </tr>{rows}
+            <tr>
+                <td><strong>Total</strong></td>
+                <td><strong>{frappe.format(total, {"fieldtype": "Currency"})}</strong></td>
+                <td></td>
             </tr>
         </table>
         
@@ -237,12 +481,13 @@ def send_credit_note_reminder_email(credit_note):
         <p>Best regards,<br>Purchase Management System</p>
         """
         
-        # Send email
+        # Queue email, the email queue worker sends it
         frappe.sendmail(
             recipients=recipients,
             subject=subject,
             message=message,
-            now=True
+            reference_doctype="Supplier",
+            reference_name=supplier
         )
         
     except Exception as e:
@@ -271,88 +516,123 @@ def manual_promotion_update():
 
 @frappe.whitelist()
 def manual_incentive_calculation():
-    """Manual trigger for incentive calculation"""
-    calculate_turnover_incentives()
-    frappe.msgprint(_("Turnover incentives calculated successfully"))
+    """Manual trigger for incentive calculation
+    
+    Returns the run progress; follow it with get_incentive_run_progress or the
+    `turnover_incentive_progress` realtime event.
+    """
+    progress = start_incentive_run()
+    frappe.msgprint(_("Turnover incentive calculation queued in {0} shards").format(progress["total"]))
+    return progress
 
 
 def cleanup_old_records():
-    """Clean up old promotional and incentive records"""
+    """Clean up old promotional and incentive records
+    
+    Rows are processed in primary key batches of `purchase_cleanup_batch_size`
+    (site config, default 1000), committing and sleeping
+    `purchase_cleanup_batch_sleep` seconds between batches so locks are held
+    briefly. Finished batches no longer match, so an interrupted run resumes
+    where it stopped.
+    """
     try:
         # Delete promotional records older than 2 years
         old_date = add_days(nowdate(), -730)
+        batch_size = cint(frappe.conf.get("purchase_cleanup_batch_size")) or CLEANUP_BATCH_SIZE
+        batch_sleep = flt(frappe.conf.get("purchase_cleanup_batch_sleep", CLEANUP_BATCH_SLEEP))
         
-        frappe.db.sql("""
-            DELETE FROM `tabSeasonal Promotion`
-            WHERE end_date < %s
+        deleted = run_in_batches("""
+            SELECT name FROM `tabSeasonal Promotion`
+            WHERE end_date < %(old_date)s
             AND is_active = 0
-        """, (old_date,))
+            AND name > %(last_name)s
+            ORDER BY name
+            LIMIT %(batch_size)s
+        """, {"old_date": old_date}, delete_promotions, batch_size, batch_sleep)
         
         # Archive old incentive records
-        frappe.db.sql("""
-            UPDATE `tabSupplier Turnover Incentive`
-            SET status = 'Archived'
-            WHERE calculation_date < %s
-            AND status != 'Archived'
-        """, (old_date,))
-        
-        frappe.logger().info("Cleaned up old promotional and incentive records")
+        archived = run_in_batches("""
+            SELECT name FROM `tabSupplier Turnover Incentive`
+            WHERE calculation_date < %(old_date)s
+            AND IFNULL(status, '') != 'Archived'
+            AND name > %(last_name)s
+            ORDER BY name
+            LIMIT %(batch_size)s
+        """, {"old_date": old_date}, archive_incentives, batch_size, batch_sleep)
+        
+        frappe.logger().info(
+            f"Cleaned up old records: {deleted} promotions deleted, {archived} incentives archived"
+        )
         
     except Exception as e:
         frappe.log_error(f"Error in cleanup_old_records: {str(e)}")
 
 
+def run_in_batches(query, values, process, batch_size, batch_sleep):
+    """Walk the names selected by query in key order, processing and committing one batch at a time"""
+    processed = 0
+    last_name = ""
+    
+    while True:
+        names = frappe.db.sql_list(query, dict(values, last_name=last_name, batch_size=batch_size))
+        if not names:
+            break
+        
+        process(names)
+        frappe.db.commit()
+        
+        processed += len(names)
+        last_name = names[-1]
+        
+        if len(names) < batch_size:
+            break
+        
+        time.sleep(batch_sleep)
+    
+    return processed
+
+
+def delete_promotions(names):
+    """Delete seasonal promotions with their item and supplier rows"""
+    for child_doctype in ("Seasonal Promotion Item", "Seasonal Promotion Supplier"):
+        frappe.db.sql(f"""
+            DELETE FROM `tab{child_doctype}`
+            WHERE parenttype = 'Seasonal Promotion'
+            AND parent IN %(names)s
+        """, {"names": names})
+    
+    frappe.db.sql("""
+        DELETE FROM `tabSeasonal Promotion`
+        WHERE name IN %(names)s
+    """, {"names": names})
+
+
+def archive_incentives(names):
+    """Mark supplier turnover incentives as archived"""
+    frappe.db.sql("""
+        UPDATE `tabSupplier Turnover Incentive`
+        SET status = 'Archived'
+        WHERE name IN %(names)s
+    """, {"names": names})
+
+
 # Additional utility functions for purchase management
 def get_purchase_analytics():
-    """Get purchase analytics data"""
+    """Get purchase analytics data from the monthly supplier rollup"""
     try:
         analytics = {}
         
         # Total purchase amount this month
-        current_month_start = nowdate().replace(day=1)
-        
-        monthly_purchase = frappe.db.sql("""
-            SELECT 
-                COUNT(*) as invoice_count,
-                SUM(grand_total) as total_amount,
-                AVG(grand_total) as avg_amount
-            FROM `tabPurchase Invoice`
-            WHERE posting_date >= %s
-            AND docstatus = 1
-        """, (current_month_start,), as_dict=True)
-        
-        analytics["monthly_purchase"] = monthly_purchase[0] if monthly_purchase else {}
+        analytics["monthly_purchase"] = get_monthly_summary()
         
         # Top suppliers by volume
-        top_suppliers = frappe.db.sql("""
-            SELECT 
-                supplier,
-                COUNT(*) as invoice_count,
-                SUM(grand_total) as total_amount
-            FROM `tabPurchase Invoice`
-            WHERE posting_date >= %s
-            AND docstatus = 1
-            GROUP BY supplier
-            ORDER BY total_amount DESC
-            LIMIT 10
-        """, (current_month_start,), as_dict=True)
-        
-        analytics["top_suppliers"] = top_suppliers
+        analytics["top_suppliers"] = get_top_suppliers(limit=10)
         
         # Active promotions count
-        active_promotions = frappe.db.count(
-            "Seasonal Promotion",
-            {
-                "is_active": 1,
-                "start_date": ["<=", nowdate()],
-                "end_date": [">=", nowdate()]
-            }
-        )
-        
-        analytics["active_promotions"] = active_promotions
+        analytics["active_promotions"] = len(get_active_promotion_index()["promotions"])
         
         return analytics
         
     except Exception as e:
         frappe.log_error(f"Error in get_purchase_analytics: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}